@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+from gevent import monkey
+from openprocurement.bot.risk_indicators.bridge import RiskIndicatorBridge
+import logging
+
+logger = logging.getLogger("RiskIndicatorBridge")
+
+# only the pipeline sizes, the connection pools are sized from the concurrency by the bridge
+ASYNC_DEFAULTS = {
+    "process_concurrency": 1000,
+    "queue_concurrency": 8,
+    "queue_streaming": True,
+    "queue_buffer_size": 10000,
+}
+
+
+class AsyncRiskIndicatorBridge(RiskIndicatorBridge):
+    """
+    Preset of the bridge for thousands of requests in flight: the risks are processed by a pool of greenlets
+    and the queue pages are streamed and requested ahead by several greenlets.
+    The options explicitly set in the config override ASYNC_DEFAULTS, the applied ones are logged.
+    The requests, retry delays and sleeps switch to the other greenlets as main.py patches the blocking IO
+    """
+
+    def __init__(self, config):
+        applied = {key: value for key, value in ASYNC_DEFAULTS.items() if key not in config["main"]}
+        main = dict(config["main"], **applied)
+        super(AsyncRiskIndicatorBridge, self).__init__(dict(config, main=main))
+        logger.info("Async engine defaults: {}".format(applied))
+
+        if "monitors" not in self.rate_limiters:
+            logger.warning("monitors_rate_limit is not set, up to {} requests to the audit API "
+                           "may be in flight at once".format(self.process_concurrency))
+
+        if not monkey.is_module_patched("socket"):
+            logger.warning("Sockets are not patched by gevent, the async engine makes one request at a time")
@@ -0,0 +1,282 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of RiskIndicatorBridge.process_risks against a local simulator of the indicators and audit APIs.
+
+    risk_indicator_benchmark [benchmark.yaml] [--scenario NAME] [--serve] [--port PORT]
+
+benchmark.yaml (every section is optional):
+
+    simulator:      # APISimulator options: data size, latency, errors, throttling
+      regions: 10
+      latency: .05
+      throttle_ratio: .01
+    main:           # bridge options shared by the scenarios
+      request_backoff: .1
+    scenarios:      # bridge options of every scenario, "engine" picks the bridge class as in the bot config
+      serial: {}
+      concurrent: {process_concurrency: 20, queue_concurrency: 4}
+      async: {engine: async}
+
+Every scenario prints a json line with its wall time, risks/sec, peak memory and request counts.
+Peak memory is the peak RSS of the whole process so far, run one scenario per process to compare it.
+With --serve the simulator is only served on the port, so the bot itself can be run against it
+"""
+from gevent import monkey
+from collections import Counter
+from random import Random
+from time import time
+from urlparse import parse_qs
+from gevent.pywsgi import WSGIServer
+from openprocurement.bot.risk_indicators.main import get_engines
+import argparse
+import resource
+import gevent
+import json
+import logging
+import yaml
+import sys
+
+logger = logging.getLogger("RiskIndicatorBridge")
+
+DEFAULT_SCENARIOS = {
+    "serial": {},
+    "concurrent": {"process_concurrency": 20, "queue_concurrency": 4},
+    "async": {"engine": "async"},
+}
+
+STATUS_LINES = {
+    200: "200 OK",
+    201: "201 Created",
+    404: "404 Not Found",
+    429: "429 Too Many Requests",
+    503: "503 Service Unavailable",
+}
+
+
+class APISimulator(object):
+    """
+    Local stand-in for the indicators API (under /indicators/) and the audit API (under /audit/)
+    serving generated queue data. Every request waits for latency seconds (slow_latency for slow_ratio of them),
+    throttle_ratio of the requests get 429 with Retry-After and error_ratio of them get 503
+    """
+
+    def __init__(self, regions=10, pages=5, risks_per_page=100, top_risk_ratio=.3, live_monitoring_ratio=.5,
+                 latency=0, slow_ratio=0, slow_latency=5, error_ratio=0, throttle_ratio=0, retry_after=1, seed=0):
+        self.region_count = regions
+        self.pages = pages
+        self.risks_per_page = risks_per_page
+        self.top_risk_ratio = top_risk_ratio
+        self.live_monitoring_ratio = live_monitoring_ratio
+        self.latency = latency
+        self.slow_ratio = slow_ratio
+        self.slow_latency = slow_latency
+        self.error_ratio = error_ratio
+        self.throttle_ratio = throttle_ratio
+        self.retry_after = retry_after
+        self.seed = seed
+        self.server = None
+        self.reset()
+
+    def reset(self):
+        """
+        Regenerates the data and clears the request counts, so every scenario starts from the same state
+        """
+        self.random = Random(self.seed)
+        self.request_counts = Counter()
+        self.regions = [u"Регіон {}".format(i) for i in range(self.region_count)]
+        self.risks = {}  # region -> risks
+        self.monitorings = {}  # tenderOuterId -> monitorings
+        self.feed = []  # monitorings in the order of their changes
+
+        for region_number, region in enumerate(self.regions):
+            self.risks[region] = []
+            for number in range(self.pages * self.risks_per_page):
+                outer_id = "{:04d}{:06d}".format(region_number, number)
+                self.risks[region].append({
+                    "tenderId": "UA-{}".format(outer_id),
+                    "tenderOuterId": outer_id,
+                    "tenderScore": round(self.random.random(), 3),
+                    "topRisk": self.random.random() < self.top_risk_ratio,
+                    "region": region,
+                })
+                if self.random.random() < self.live_monitoring_ratio:
+                    self.add_monitoring(outer_id, "active")
+
+    def add_monitoring(self, tender_id, status):
+        monitoring = {"id": "m{}".format(len(self.feed)), "tender_id": tender_id, "status": status}
+        self.monitorings.setdefault(tender_id, []).append(monitoring)
+        self.feed.append(monitoring)
+        return monitoring
+
+    def get_details(self, outer_id):
+        return {
+            "id": outer_id,
+            "status": "active.tendering",
+            "indicatorsInfo": [{"indicatorId": str(i), "indicatorShortName": u"Індикатор {}".format(i)}
+                               for i in range(5)],
+            "indicators": {
+                "tenderIndicators": [{"indicatorCode": str(i), "value": i % 2} for i in range(3)],
+                "lotIndicators": [{"indicatorCode": str(i), "value": 1} for i in range(3, 5)],
+            },
+        }
+
+    def handle(self, method, path, query, body=None):
+        """
+        Returns (status code, headers, data) of the request
+        """
+        endpoint, data = self.route(method, path, query, body)
+        self.request_counts[endpoint] += 1
+
+        delay = self.slow_latency if self.random.random() < self.slow_ratio else self.latency
+        if delay:
+            gevent.sleep(delay)
+
+        if data is None:
+            return 404, {}, {"errors": ["Not Found"]}
+        elif self.random.random() < self.throttle_ratio:
+            return 429, {"Retry-After": str(self.retry_after)}, {"errors": ["Too Many Requests"]}
+        elif self.random.random() < self.error_ratio:
+            return 503, {}, {"errors": ["Service Unavailable"]}
+        return 201 if method == "POST" else 200, {}, data
+
+    def route(self, method, path, query, body):
+        """
+        Returns the endpoint name the request is counted by and the response data, None if it's not found
+        """
+        query = {key: values[0] for key, values in parse_qs(query).items()}
+        parts = [part for part in path.split("/") if part]
+
+        if parts[:1] == ["indicators"]:
+            parts = parts[1:]
+            if parts == ["region-indicators-queue", "regions"]:
+                return "queue_regions", self.regions
+            elif parts == ["region-indicators-queue"]:
+                risks = self.risks.get(query.get("region", "").decode("utf-8"), [])
+                limit, page = int(query.get("limit", 100)), int(query.get("page", 0))
+                return "queue_page", {
+                    "data": risks[page * limit:(page + 1) * limit],
+                    "pagination": {"totalPages": max(1, -(-len(risks) // limit))},
+                }
+            elif len(parts) == 2 and parts[0] == "tenders" and parts[1].startswith("UA-"):
+                return "tender_details", self.get_details(parts[1][3:])
+
+        elif parts[:1] == ["audit"]:
+            parts = parts[1:]
+            if method == "POST" and parts == ["monitorings"]:
+                monitoring = self.add_monitoring(json.loads(body)["data"]["tender_id"], "draft")
+                return "monitoring_post", {"data": {"id": monitoring["id"], "status": monitoring["status"]}}
+            elif parts == ["monitorings"]:
+                offset, limit = int(query.get("offset", 0)), int(query.get("limit", 100))
+                data = self.feed[offset:offset + limit]
+                return "monitorings_feed", {"data": data, "next_page": {"offset": offset + len(data)}}
+            elif len(parts) == 3 and parts[0] == "tenders" and parts[2] == "monitorings":
+                return "monitorings_list", {"data": self.monitorings.get(parts[1], [])}
+
+        return "other", None
+
+    def __call__(self, environ, start_response):
+        body = None
+        if environ["REQUEST_METHOD"] == "POST":
+            body = environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+
+        status, headers, data = self.handle(
+            environ["REQUEST_METHOD"], environ["PATH_INFO"], environ.get("QUERY_STRING", ""), body)
+
+        headers = dict(headers, **{"Content-Type": "application/json"})
+        start_response(STATUS_LINES.get(status, str(status)), list(headers.items()))
+        return [json.dumps(data).encode("utf-8")]
+
+    def serve(self, host="127.0.0.1", port=0):
+        self.server = WSGIServer((host, port), self, log=None)
+        self.server.start()
+        self.base_url = "http://{}:{}/".format(host, self.server.server_port)
+        return self.server
+
+    @property
+    def indicators_host(self):
+        return self.base_url + "indicators/"
+
+    @property
+    def monitors_host(self):
+        return self.base_url + "audit/"
+
+
+def get_peak_rss():
+    """
+    Returns the peak resident memory of the process in megabytes
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+
+def run_scenario(simulator, name, options, base_options=None):
+    """
+    Runs process_risks once with the bridge options against the simulator, returns the results
+    """
+    simulator.reset()
+    config = {"main": {
+        "indicators_host": simulator.indicators_host,
+        "monitors_host": simulator.monitors_host,
+        "monitors_token": "benchmark",
+    }}
+    config["main"].update(base_options or {})
+    config["main"].update(options)
+    bridge = get_engines()[config["main"].get("engine", "default")](config)
+
+    started = time()
+    bridge.process_risks()
+    wall_time = time() - started
+
+    for session in bridge.sessions.values():
+        session.close()
+
+    stats = dict(bridge.process_stats)
+    return {
+        "scenario": name,
+        "wall_time": round(wall_time, 3),
+        "risks": stats.get("processed", 0),
+        "risks_per_sec": round(stats.get("processed", 0) / wall_time, 1) if wall_time else None,
+        "peak_rss_mb": round(get_peak_rss(), 1),
+        "requests": dict(simulator.request_counts),
+        "stats": stats,
+    }
+
+
+def main(args=None):
+    monkey.patch_all()
+    parser = argparse.ArgumentParser(description="Benchmark the bridge against a local API simulator")
+    parser.add_argument("config", nargs="?", help="benchmark yaml")
+    parser.add_argument("--scenario", action="append", help="run only the named scenarios")
+    parser.add_argument("--serve", action="store_true", help="only serve the simulator")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args(args)
+
+    config = {}
+    if args.config:
+        with open(args.config) as config_file_obj:
+            config = yaml.load(config_file_obj.read()) or {}
+    logging.basicConfig(level=logging.WARNING)
+    logger.setLevel(config.get("log_level", logging.WARNING))
+
+    simulator = APISimulator(**config.get("simulator", {}))
+    server = simulator.serve(port=args.port)
+    if args.serve:
+        sys.stdout.write("indicators_host: {}\nmonitors_host: {}\n".format(
+            simulator.indicators_host, simulator.monitors_host))
+        sys.stdout.flush()
+        server.serve_forever()
+        return
+
+    scenarios = config.get("scenarios") or DEFAULT_SCENARIOS
+    for name in sorted(scenarios):
+        if args.scenario and name not in args.scenario:
+            continue
+        result = run_scenario(simulator, name, scenarios[name] or {}, config.get("main"))
+        sys.stdout.write(json.dumps(result, sort_keys=True) + "\n")
+        sys.stdout.flush()
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
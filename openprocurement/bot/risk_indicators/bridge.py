@@ -1,9 +1,34 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime, timedelta
-from collections import defaultdict
-from time import sleep
+from collections import defaultdict, deque
+from itertools import izip, repeat, count
+from time import sleep, time
 from urllib import quote_plus
+from urlparse import urlparse
+from gevent.pool import Pool
+from gevent.queue import Queue
+from gevent.event import AsyncResult
+from openprocurement.bot.risk_indicators.cache import LRUCache, ResponseCache
+from openprocurement.bot.risk_indicators.decoding import JSONDecoder, ACCEPT_ENCODING, get_wire_size
+from openprocurement.bot.risk_indicators.metrics import Metrics, ProcessStats
+from openprocurement.bot.risk_indicators.proxies import ProxyPool
+from openprocurement.bot.risk_indicators.recording import Recorder, Replayer
+from openprocurement.bot.risk_indicators import snapshots
+from openprocurement.bot.risk_indicators.scheduler import RegionScheduler
+from openprocurement.bot.risk_indicators.streaming import StreamedQueuePage
+from openprocurement.bot.risk_indicators.storage import (
+    ProcessedTenderStore, CheckpointStore, MonitoringOutbox, LeaseStore
+)
+from openprocurement.bot.risk_indicators.throttling import (
+    CircuitBreaker, TokenBucket, AIMDLimiter, get_backoff_delay, parse_retry_after
+)
+from openprocurement.bot.risk_indicators.tracing import Tracer, Profiler
+import gevent
+import heapq
+import signal
+import tempfile
+import zlib
 import requests
 import logging
 
@@ -17,22 +42,185 @@ class RiskIndicatorBridge(object):
         config = config["main"]
         self.indicators_host = config["indicators_host"]
         self.indicators_proxy = config.get("indicators_proxy")
+        if isinstance(self.indicators_proxy, (list, tuple)):
+            self.proxy_pool = ProxyPool(
+                self.indicators_proxy,
+                strategy=config.get("proxy_strategy", ProxyPool.LEAST_OUTSTANDING),
+                eject_threshold=config.get("proxy_eject_threshold", 3),
+            )
+        else:
+            self.proxy_pool = None
+        self.proxy_probe_interval = config.get("proxy_probe_interval", 30)
         self.queue_limit = config.get("queue_limit", 100)
+        self.queue_concurrency = config.get("queue_concurrency", 1)
+        self.queue_streaming = config.get("queue_streaming", False)
+        self.queue_stream_chunk_size = config.get("queue_stream_chunk_size", 64 * 1024)
+        self.queue_buffer_size = config.get("queue_buffer_size", 1000)
+        self.process_concurrency = config.get("process_concurrency", 1)
+        self.prioritize_risks = config.get("prioritize_risks", False)
+        self.priority_queue_size = config.get("priority_queue_size")
+        self.run_time_budget = config.get("run_time_budget")
+        self.deadline = None
+        self.seen_tenders = LRUCache(config.get("seen_tenders_size", 100000))
 
         self.monitors_host = config["monitors_host"]
         self.monitors_token = config["monitors_token"]
         self.skip_monitoring_statuses = config.get("skip_monitoring_statuses", ("active", "draft"))
+        self.monitoring_index_enabled = config.get("monitoring_index", False)
+        self.monitoring_index_limit = config.get("monitoring_index_limit", 1000)
 
+        self.prefetch_details = config.get("prefetch_details", False)
+        self.prefetch_min_ratio = config.get("prefetch_min_ratio", .2)
+        self.prefetch_min_samples = config.get("prefetch_min_samples", 20)
+        # a prefetch per risk in progress fits, the evicted ones are killed
+        self.details_cache = LRUCache(
+            max(config.get("prefetch_cache_size", 100), self.process_concurrency),
+            on_evict=self.cancel_prefetch,
+        )
+
+        self.run_mode = config.get("run_mode", "daily")
         self.run_interval = timedelta(seconds=config.get("run_interval", 24 * 3600))
+        self.regions_refresh_interval = config.get("regions_refresh_interval", 3600)
+        self.scheduler = RegionScheduler(
+            min_interval=config.get("poll_min_interval", 5 * 60),
+            max_interval=config.get("poll_max_interval", 6 * 3600),
+            jitter=config.get("poll_jitter", .1),
+        )
         self.queue_error_interval = config.get("queue_error_interval", 30 * 60)
         self.request_retries = config.get("request_retries", 5)
         self.request_timeout = config.get("request_timeout", 10)
+        self.request_backoff = config.get("request_backoff", 1)
+        self.request_backoff_max = config.get("request_backoff_max", 60)
+        self.circuit_breaker_threshold = config.get("circuit_breaker_threshold", 5)
+        self.circuit_breaker_cooldown = config.get("circuit_breaker_cooldown", 60)
+
+        self.rate_limiters = {}
+        for budget in ("indicators", "monitors", "monitors_post"):
+            rate = config.get("{}_rate_limit".format(budget))
+            if rate:
+                self.rate_limiters[budget] = TokenBucket(rate)
+
+        self.adaptive_concurrency = config.get("adaptive_concurrency", False)
+        self.adaptive_concurrency_initial = config.get("adaptive_concurrency_initial", 4)
+        self.adaptive_concurrency_min = config.get("adaptive_concurrency_min", 1)
+        self.adaptive_concurrency_max = config.get("adaptive_concurrency_max", 50)
+        self.adaptive_latency_target = config.get("adaptive_latency_target", 2)
+        self.connection_pool_size = config.get("connection_pool_size", 10)
+        self.coalesce_requests = config.get("coalesce_requests", True)
+        self.compression = config.get("compression", True)
+        self.json_decoder = JSONDecoder(config.get("json_decoder", "json"))
+
+        response_cache_size = config.get("response_cache_size", 0)
+        if response_cache_size:
+            self.response_cache = ResponseCache(response_cache_size, ttl=config.get("response_cache_ttl", 0))
+        else:
+            self.response_cache = None
+
+        self.storage_path = config.get("storage_path")
+        if self.storage_path:
+            self.processed_store = ProcessedTenderStore(
+                self.storage_path,
+                ttl=config.get("processed_tender_ttl", 7 * 24 * 3600),
+            )
+            self.checkpoint_store = CheckpointStore(self.storage_path)
+        else:
+            self.processed_store = None
+            self.checkpoint_store = None
+
+        if self.storage_path and config.get("monitoring_outbox", False):
+            self.outbox = MonitoringOutbox(self.storage_path)
+        else:
+            self.outbox = None
+        self.outbox_batch_size = config.get("outbox_batch_size", 10)
+        self.outbox_interval = config.get("outbox_interval", 5)
+        self.outbox_retry_max = config.get("outbox_retry_max", 3600)
+        self.outbox_max_attempts = config.get("outbox_max_attempts", 20)
+        self.outbox_claim_ttl = config.get("outbox_claim_ttl", 5 * 60)
+
+        self.shard_count = config.get("shard_count", 1)
+        self.shard_index = config.get("shard_index", 0)
+        self.shard_id = config.get("shard_id", "shard-{}".format(self.shard_index))
+        self.lease_ttl = config.get("lease_ttl", 10 * 60)
+        lease_path = config.get("lease_path", self.storage_path)
+        if self.shard_count > 1 and lease_path:
+            self.lease_store = LeaseStore(lease_path)
+        else:
+            self.lease_store = None
+            if self.shard_count > 1:
+                logger.warning("Neither lease_path nor storage_path is set, the regions are split between "
+                               "the shards by their name hash only and aren't taken over from the stopped shards")
+        self.run_id = None
+        self.queued_risks = 0  # risks yielded by the queue in the run
+        self.started_risks = 0
+        self.risks_in_progress = set()  # numbers of the started risks that are not processed yet
+        self.scanned_pages = deque()  # (queued_risks, region, page, done) of the pages to checkpoint
+
+        snapshot_dir = config.get("snapshot_dir")
+        if snapshot_dir and snapshots.np is None:
+            logger.warning("numpy is not installed, the run snapshots are disabled")
+        elif snapshot_dir:
+            self.snapshot_dir = snapshots.SnapshotDir(snapshot_dir, keep=config.get("snapshot_keep", 30))
+        else:
+            self.snapshot_dir = None
+        self.snapshot_skip_created = config.get("snapshot_skip_created", False)
+        self.snapshot_writer = None
+        self.previous_snapshot = None
+        self.snapshot_skip = {}
+
+        self.metrics_host = config.get("metrics_host", "0.0.0.0")
+        self.metrics_port = config.get("metrics_port")
+        self.metrics = Metrics()
 
-        self.process_stats = defaultdict(int)
+        self.trace_path = config.get("trace_path")
+        self.tracer = Tracer(max_events=config.get("trace_max_events", 100000) if self.trace_path else 0)
+        self.profile_runs = config.get("profile_runs", False)
+        self.profile_signal = config.get("profile_signal")
+        self.profiler = Profiler(config.get("profile_dir", tempfile.gettempdir()))
+
+        replay_path = config.get("replay_path")
+        if replay_path:
+            self.replayer = Replayer(
+                replay_path,
+                speed=config.get("replay_speed", 0),
+                stub_posts=config.get("replay_stub_posts", True),
+            )
+        else:
+            self.replayer = None
+        record_path = config.get("record_path")
+        if record_path and not replay_path:
+            self.recorder = Recorder(record_path, secrets=[self.monitors_token])
+        else:
+            self.recorder = None
+
+        self.sessions = {}
+        self.circuit_breakers = {}
+        self.concurrency_limiters = {}
+        self.pending_requests = {}  # url -> AsyncResult of the GET in progress
+        self.monitoring_index = {}  # tender_id -> {monitoring_id: status}
+        self.monitoring_index_offset = None
+
+        self.process_stats = ProcessStats(self.metrics.risks)
+        self.transfer_stats = defaultdict(lambda: defaultdict(int))  # endpoint -> responses, bytes, decode time
 
     def run(self):
+        if self.metrics_port:
+            self.metrics.serve(self.metrics_host, self.metrics_port)
+        if self.profile_signal:
+            signal.signal(getattr(signal, self.profile_signal), self.profiler.toggle)
+        if self.outbox is not None:
+            gevent.spawn(self.run_outbox_sender)
+        if self.lease_store is not None:
+            gevent.spawn(self.run_shard_heartbeat)
+        if self.proxy_pool is not None:
+            gevent.spawn(self.run_proxy_prober)
+
+        if self.run_mode == "continuous":
+            return self.run_continuously()
+
         while True:
             start = datetime.now()
+            if self.profile_runs:
+                self.profiler.start()
             try:
                 self.process_risks()
             except Exception as e:
@@ -40,78 +228,602 @@ class RiskIndicatorBridge(object):
                 sleep_seconds = self.queue_error_interval
             else:
                 run_time = datetime.now() - start
-                sleep_seconds = (self.run_interval - run_time).seconds
+                sleep_seconds = int((self.run_interval - run_time).total_seconds())
+            if self.profile_runs:
+                self.profiler.stop()
 
             if sleep_seconds > 0:
                 logger.info("Sleep for {} seconds".format(sleep_seconds))
                 sleep(sleep_seconds)
 
+    def run_continuously(self):
+        """
+        Polls the regions one at a time, each on its own interval planned by the scheduler,
+        so polls never overlap and the load is spread in time
+        """
+        regions_updated = None
+        while True:
+            if regions_updated is None or time() - regions_updated >= self.regions_refresh_interval:
+                try:
+                    regions = self.request("{}region-indicators-queue/regions/".format(self.indicators_host))
+                except Exception as e:
+                    logger.exception(e)
+                    if not self.scheduler.regions:
+                        sleep(self.queue_error_interval)
+                        continue
+                else:
+                    self.scheduler.set_regions(self.get_shard_regions(regions))
+                    regions_updated = time()
+
+            if not self.scheduler.regions:
+                sleep(self.regions_refresh_interval)
+                continue
+
+            region, wait = self.scheduler.get_next()
+            if wait > 0:
+                sleep(wait)
+            self.poll_region(region)
+
+    def poll_region(self, region):
+        """
+        Processes the region queue risks that are new or changed since the previous poll of the region
+        """
+        self.reset_run_state()
+        if self.lease_store is not None and not self.lease_store.acquire(region, self.shard_id, self.lease_ttl):
+            logger.info(u"Region {} is leased by another shard".format(region))
+            self.scheduler.fail_poll(region, self.regions_refresh_interval)
+            return
+
+        if self.monitoring_index_enabled:
+            self.sync_monitoring_index()  # the changes since the previous poll, usually a single request
+
+        self.scheduler.start_poll(region)
+        pool = Pool(self.process_concurrency)
+        changed = 0
+        lost = False
+        try:
+            for _, page, response in self.get_region_pages(region):
+                if page > 0 and self.lease_store is not None \
+                        and not self.lease_store.acquire(region, self.shard_id, self.lease_ttl):
+                    logger.warning(u"Lease of region {} is lost".format(region))
+                    lost = True
+                    break
+                self.set_queue_position(region, page)
+                for risk in response.get("data", []):
+                    if self.scheduler.is_changed(region, risk):
+                        changed += 1
+                        pool.spawn(self.poll_risk, region, risk)
+                    else:
+                        self.scheduler.mark_seen(region, risk)
+        except Exception as e:
+            logger.exception(e)
+            pool.join()
+            self.scheduler.fail_poll(region, self.queue_error_interval)
+        else:
+            pool.join()
+            if lost:
+                self.scheduler.fail_poll(region, self.regions_refresh_interval)
+                return
+            self.scheduler.finish_poll(region, changed)
+            logger.info(u"Region {} poll finished: {}".format(region, dict(self.process_stats)))
+            self.report_phases()
+        finally:
+            if self.lease_store is not None:
+                self.lease_store.release(region, self.shard_id)
+
+    def poll_risk(self, region, risk):
+        if self.process_risk_safely(risk):
+            self.scheduler.mark_seen(region, risk)
+
+    def reset_run_state(self):
+        """
+        Clears the stats and the caches left by the previous run or region poll
+        """
+        self.process_stats = ProcessStats(self.metrics.risks)
+        self.transfer_stats.clear()
+        self.seen_tenders.clear()
+        self.tracer.reset()
+        self.details_cache.clear()
+        for rate_limiter in self.rate_limiters.values():
+            rate_limiter.reset_stats()
+        if self.proxy_pool is not None:
+            self.proxy_pool.reset_stats()
+        self.deadline = None
+        self.queued_risks = self.started_risks = 0
+        self.risks_in_progress.clear()
+        self.scanned_pages.clear()
+
     def process_risks(self):
-        self.process_stats = defaultdict(int)
+        self.reset_run_state()
+        if self.run_time_budget:
+            self.deadline = time() + self.run_time_budget
 
-        for risk in self.queue:
+        if self.lease_store is not None:
+            self.lease_store.heartbeat(self.shard_id, self.shard_index)
+
+        if self.checkpoint_store is not None:
+            self.run_id = self.checkpoint_store.start_run(self.run_interval.total_seconds(), self.shard_id)
+            logger.info("Processing run {}".format(self.run_id))
+
+        if self.monitoring_index_enabled:
+            self.sync_monitoring_index()
+
+        if self.snapshot_dir is not None:
+            self.start_snapshot()
+
+        try:
+            if self.process_concurrency > 1:
+                self.process_risks_concurrently()
+            else:
+                for risk in self.iter_risks():
+                    self.process_queued_risk(self.start_risk(), risk)
+        finally:
+            if self.snapshot_writer is not None:  # a failed run snapshot keeps the outcomes of its processed risks
+                self.save_snapshot()
+            self.save_processed_pages()
+
+        if self.run_id is not None:
+            self.checkpoint_store.finish_run(self.run_id)
+
+        logger.info("Risk processing finished: {}".format(dict(self.process_stats)))
+        self.report_phases()
+        if self.lease_store is not None:
+            self.lease_store.save_stats(self.shard_id, dict(self.process_stats))
+            logger.info("Shards risk processing summary: {}".format(self.lease_store.get_stats()[1]))
+        if self.rate_limiters or self.concurrency_limiters:
+            logger.info("Request rates: {}".format(self.get_rates_summary()))
+        if self.proxy_pool is not None:
+            logger.info("Indicators proxies: {}".format(self.proxy_pool.get_summary()))
+
+    def start_snapshot(self):
+        self.snapshot_writer = snapshots.SnapshotWriter()
+        try:
+            self.previous_snapshot = self.snapshot_dir.get_latest()
+        except Exception as e:
+            logger.exception(e)
+            self.previous_snapshot = None
+
+        if self.snapshot_skip_created and self.previous_snapshot is not None:
+            self.snapshot_skip = snapshots.get_skip_list(self.previous_snapshot)
+        else:
+            self.snapshot_skip = {}
+
+    def save_snapshot(self):
+        """
+        Saves the snapshot of the run and logs its region analytics compared to the previous run
+        """
+        try:
+            path, snapshot = self.snapshot_dir.save(self.snapshot_writer)
+            logger.info(u"Run snapshot {} of {} risks, by region: {}".format(
+                path, len(snapshot), snapshots.summarize(snapshot, self.previous_snapshot)))
+        except Exception as e:
+            logger.exception(e)
+        finally:
+            self.snapshot_writer = None
+            self.previous_snapshot = None
+            self.snapshot_skip = {}
+
+    def report_phases(self):
+        """
+        Logs the time spent in every phase of the run and the responses size and decoding time by endpoint,
+        writes the trace file if it's configured
+        """
+        logger.info("Run phases: {}".format(self.tracer.get_summary()))
+        logger.info("Responses by endpoint ({} json decoder): {}".format(
+            self.json_decoder.name,
+            {
+                endpoint: dict(stats, decode_time=round(stats["decode_time"], 3))
+                for endpoint, stats in self.transfer_stats.items()
+            }
+        ))
+        if self.trace_path:
             try:
-                self.process_risk(risk)
+                self.tracer.dump(self.trace_path)
             except Exception as e:
                 logger.exception(e)
-                self.process_stats["failed"] += 1
 
-        logger.info("Risk processing finished: {}".format(dict(self.process_stats)))
+    def process_risks_concurrently(self):
+        """
+        A producer greenlet reads the queue ahead into a buffer of queue_buffer_size risks
+        while a pool of process_concurrency greenlets processes them.
+        process_stats stay consistent as greenlets switch only on IO, never inside a counter update
+        """
+        risks = Queue(self.queue_buffer_size)
+        producer = gevent.spawn(self.fill_risks_buffer, risks)
+
+        pool = Pool(self.process_concurrency)
+        for risk in risks:
+            pool.spawn(self.process_queued_risk, self.start_risk(), risk)
+        pool.join()
+
+        producer.get()  # re-raises queue exceptions
+
+    def fill_risks_buffer(self, risks):
+        try:
+            for risk in self.iter_risks():
+                risks.put(risk)
+        finally:
+            risks.put(StopIteration)
+
+    def iter_risks(self):
+        """
+        Yields the risks to process: the queue as is or, in the priority mode, the risks that are not top ones
+        as they are scanned and then the top risks by tenderScore descending. Stops once the run deadline is reached
+        """
+        risks = self.iter_prioritized_risks() if self.prioritize_risks else self.queue
+        for risk in risks:
+            if self.is_deadline_reached():
+                break
+            yield risk
+
+    def is_deadline_reached(self):
+        if self.deadline is not None and time() >= self.deadline:
+            if not self.process_stats["deadline_reached"]:
+                logger.warning("Run time budget of {} seconds is exhausted".format(self.run_time_budget))
+                self.process_stats["deadline_reached"] = 1
+            return True
+        return False
+
+    def iter_prioritized_risks(self):
+        """
+        Scans the whole queue yielding the risks that are not top ones on the way, so they are processed
+        by the same pool, then yields the top risks (only the priority_queue_size highest if set)
+        by tenderScore descending
+        """
+        heap, order = [], count()
+        for risk in self.queue:
+            if self.is_deadline_reached():
+                break
+
+            if not risk["topRisk"]:
+                yield risk
+                continue
+
+            item = (risk.get("tenderScore") or 0, -next(order), risk)
+            if self.priority_queue_size is None or len(heap) < self.priority_queue_size:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heappushpop(heap, item)
+                self.process_stats["skipped_low_priority"] += 1
+
+        for _, _, risk in sorted(heap, reverse=True):
+            yield risk
+
+    def start_risk(self):
+        """
+        Returns the number of the next queue risk, the risks are started in the queue order
+        """
+        self.started_risks += 1
+        self.risks_in_progress.add(self.started_risks)
+        return self.started_risks
+
+    def process_queued_risk(self, number, risk):
+        """
+        Processes a risk of the queue and saves the checkpoints of the pages which risks are all processed now.
+        A killed greenlet leaves its risk in progress, so the page isn't checkpointed, as does a risk
+        deferred by the run deadline, the buffered risks are not processed once it's reached
+        """
+        if self.is_deadline_reached():
+            self.process_stats["deferred"] += 1
+            return False
+
+        result = self.process_risk_safely(risk)
+        self.risks_in_progress.discard(number)
+        self.save_processed_pages()
+        return result
+
+    def save_processed_pages(self):
+        """
+        Saves the checkpoints of the scanned pages once all the risks up to their ends are processed,
+        not once the queue is read past them, so a restart doesn't skip the buffered and the in progress risks
+        """
+        if not self.scanned_pages:
+            return
+        processed = min(self.risks_in_progress) - 1 if self.risks_in_progress else self.started_risks
+        while self.scanned_pages and self.scanned_pages[0][0] <= processed:
+            _, region, page, done = self.scanned_pages.popleft()
+            self.checkpoint_store.save_page(self.run_id, region, page, done)
+
+    def process_risk_safely(self, risk):
+        try:
+            self.process_risk(risk)
+        except Exception as e:
+            logger.exception(e)
+            self.process_stats["failed"] += 1
+            if self.snapshot_writer is not None:
+                self.snapshot_writer.add(risk, snapshots.FAILED)
+            return False
+        return True
 
     def process_risk(self, risk):
         self.process_stats["processed"] += 1
 
+        # a tender can be met again in another region or on a shifted queue page,
+        # it's marked before any request so the concurrent greenlets skip it as well
+        if risk["tenderOuterId"] in self.seen_tenders:
+            self.process_stats["skipped_duplicate"] += 1
+            return
+        self.seen_tenders[risk["tenderOuterId"]] = True
+
+        if self.processed_store is not None and self.processed_store.is_unchanged(risk):
+            self.process_stats["skipped_unchanged"] += 1
+            if self.snapshot_writer is not None:
+                self.snapshot_writer.add(risk, snapshots.UNCHANGED)
+            return
+
+        if self.snapshot_skip.get(risk["tenderOuterId"], False) == (risk.get("tenderScore"), bool(risk["topRisk"])):
+            self.process_stats["skipped_created_before"] += 1
+            # the outcome is carried forward, so the tender stays in the skip list of the next runs
+            self.snapshot_writer.add(risk, ProcessedTenderStore.CREATED)
+            return
+
         if risk["topRisk"]:
             self.process_stats["processed_top"] += 1
 
-            monitorings = self.get_tender_monitoring_list(risk["tenderOuterId"])
-            has_live_monitoring = any(m["status"] in self.skip_monitoring_statuses for m in monitorings)
+            if self.should_prefetch_details() and not self.is_monitoring_indexed(risk["tenderOuterId"]):
+                self.prefetch_item_details(risk["tenderId"])
+
+            statuses = self.get_tender_monitoring_statuses(risk["tenderOuterId"])
+            has_live_monitoring = any(status in self.skip_monitoring_statuses for status in statuses)
 
             if not has_live_monitoring:
                 self.process_stats["processed_to_start"] += 1
 
-                details = self.get_item_details(risk["tenderId"])
+                # an entry is consumed once, so a later poll doesn't get a stale or failed prefetch
+                prefetched = self.details_cache.pop(risk["tenderId"])
+                details = prefetched.get() if prefetched is not None else None
+                if details is None:
+                    details = self.get_item_details(risk["tenderId"])
                 self.start_monitoring(risk, details)
+                outcome = ProcessedTenderStore.CREATED
+            else:
+                prefetched = self.details_cache.pop(risk["tenderId"])
+                if prefetched is not None:
+                    prefetched.kill(block=False)
+                    self.process_stats["details_prefetch_wasted"] += 1
+                outcome = ProcessedTenderStore.LIVE_MONITORING
+        else:
+            outcome = ProcessedTenderStore.NOT_TOP_RISK
+
+        if self.processed_store is not None:
+            self.processed_store.save(risk, outcome)
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.add(risk, outcome)
+
+    def should_prefetch_details(self):
+        """
+        Details are prefetched while the share of the top risks that need a monitoring
+        stays above prefetch_min_ratio in the current run
+        """
+        if not self.prefetch_details:
+            return False
+
+        processed_top = self.process_stats["processed_top"]
+        if processed_top < self.prefetch_min_samples:
+            return True
+        return float(self.process_stats["processed_to_start"]) / processed_top >= self.prefetch_min_ratio
+
+    def prefetch_item_details(self, item_id):
+        if item_id not in self.details_cache:
+            self.details_cache[item_id] = gevent.spawn(self.get_prefetched_item_details, item_id)
+            self.process_stats["details_prefetched"] += 1
+
+    def cancel_prefetch(self, item_id, prefetched):
+        if not prefetched.ready():
+            prefetched.kill(block=False)
+            self.process_stats["details_prefetch_cancelled"] += 1
+
+    def get_prefetched_item_details(self, item_id):
+        """
+        Returns None if the prefetch fails, the details are requested again once they are needed
+        """
+        try:
+            return self.get_item_details(item_id)
+        except Exception as e:
+            logger.warning("Prefetch of tender {} details failed: {}".format(item_id, e))
+            self.process_stats["details_prefetch_failed"] += 1
 
     # Access APIs methods #
 
     @property
     def queue(self):
         regions = self.request("{}region-indicators-queue/regions/".format(self.indicators_host))
+        regions = self.get_shard_regions(regions)
+
+        if self.queue_concurrency > 1:
+            pages = self.get_region_pages_concurrently(regions)
+        else:
+            pages = (page for region in regions for page in self.get_region_pages(region))
+
+        lost_regions = set()
+        try:
+            for region, page, response in pages:
+                if region in lost_regions:
+                    continue
+                if page > 0 and self.lease_store is not None \
+                        and not self.lease_store.acquire(region, self.shard_id, self.lease_ttl):
+                    logger.warning(u"Lease of region {} is lost".format(region))
+                    lost_regions.add(region)
+                    continue
+                self.set_queue_position(region, page)
 
-        for region in regions:
-            page, total_pages = 0, 1
-
-            while page < total_pages:
-                url = "{}region-indicators-queue/?region={}&limit={}&page={}".format(
-                    self.indicators_host,
-                    quote_plus(region.encode('utf-8')),
-                    self.queue_limit,
-                    page
-                )
-                response = self.request(url)
                 data = response.get("data", [])
                 for risk in data:
+                    self.queued_risks += 1
                     yield risk
 
+                last_page = page + 1 >= response.get("pagination", {}).get("totalPages", 1)
+                # the top risks of the priority mode are held until the scan ends,
+                # so its pages aren't checkpointed and a retried run scans the queue again
+                if self.run_id is not None and not self.prioritize_risks:
+                    self.scanned_pages.append((self.queued_risks, region, page, last_page))
+                if last_page and self.lease_store is not None:
+                    self.lease_store.release(region, self.shard_id)
+        finally:
+            if self.lease_store is not None:  # the regions already done by the run or left by an error
+                for region in regions:
+                    self.lease_store.release(region, self.shard_id)
+
+    def set_queue_position(self, region, page):
+        self.metrics.queue_page.clear()
+        self.metrics.queue_page.set(page, region=region)
+
+    def get_region_shard(self, region):
+        return (zlib.crc32(region.encode("utf-8")) & 0xffffffff) % self.shard_count
+
+    def get_shard_regions(self, regions):
+        """
+        Returns the regions this shard processes: the leased ones or, without a lease store, its own ones
+        """
+        if self.lease_store is not None:
+            return self.lease_regions(regions)
+        elif self.shard_count > 1:
+            return [region for region in regions if self.get_region_shard(region) == self.shard_index]
+        return regions
+
+    def lease_regions(self, regions):
+        """
+        Returns the regions leased by this shard: its own ones (by the region name hash)
+        and the ones of the shards without a heartbeat for lease_ttl, provided their leases are free
+        """
+        live_shards = self.lease_store.get_live_shards(self.lease_ttl)
+        leased = []
+        for region in regions:
+            shard_index = self.get_region_shard(region)
+            if shard_index != self.shard_index and shard_index in live_shards:
+                continue
+            if self.lease_store.acquire(region, self.shard_id, self.lease_ttl):
+                leased.append(region)
+
+        logger.info(u"Shard {} leased regions: {}".format(self.shard_id, u", ".join(leased)))
+        return leased
+
+    def run_shard_heartbeat(self):
+        while True:
+            try:
+                self.lease_store.heartbeat(self.shard_id, self.shard_index)
+            except Exception as e:
+                logger.exception(e)
+            sleep(self.lease_ttl / 3.)
+
+    def get_region_start_page(self, region):
+        """
+        Returns the page to start the region scan from or None if the current run has already scanned it
+        """
+        if self.run_id is None:
+            return 0
+        return self.checkpoint_store.get_next_page(self.run_id, region)
+
+    def get_region_pages(self, region):
+        page = self.get_region_start_page(region)
+        if page is None:
+            return
+        total_pages = page + 1
+
+        while page < total_pages:
+            response = self.get_queue_page(region, page)
+            yield region, page, response
+
+            total_pages = response.get("pagination", {}).get("totalPages", 1)
+            page += 1
+
+    def get_region_pages_concurrently(self, regions):
+        """
+        Yields the same (region, page, response) as get_region_pages does for every region, in the same order,
+        but the first pages of the regions and the rest pages of a region (once totalPages is known)
+        are requested by a pool of queue_concurrency greenlets
+        """
+        start_pages = [(region, self.get_region_start_page(region)) for region in regions]
+        start_pages = [(region, page) for region, page in start_pages if page is not None]
+        if not start_pages:
+            return
+
+        pool = Pool(self.queue_concurrency)
+        try:
+            first_pages = pool.imap(self.get_queue_page, *zip(*start_pages), maxsize=self.queue_concurrency)
+            for (region, start_page), response in izip(start_pages, first_pages):
+                yield region, start_page, response
+
                 total_pages = response.get("pagination", {}).get("totalPages", 1)
-                page += 1
+                rest_page_numbers = xrange(start_page + 1, total_pages)
+                rest_pages = pool.imap(self.get_queue_page, repeat(region), rest_page_numbers,
+                                       maxsize=self.queue_concurrency)
+                for page, response in izip(rest_page_numbers, rest_pages):
+                    yield region, page, response
+        finally:
+            pool.kill()
+
+    def get_queue_page(self, region, page):
+        url = "{}region-indicators-queue/?region={}&limit={}&page={}".format(
+            self.indicators_host,
+            quote_plus(region.encode('utf-8')),
+            self.queue_limit,
+            page
+        )
+        with self.tracer.span("queue_page"):
+            if not self.queue_streaming:
+                return self.request(url)
+            # the page is read within the request retries, so a broken stream is requested again
+            # and the connection isn't held open while the page risks are processed
+            return self.request(url, stream=self.read_queue_page)
+
+    def read_queue_page(self, response):
+        return StreamedQueuePage(response.iter_content(self.queue_stream_chunk_size)).load()
 
     def get_item_details(self, item_id):
         url = "{}tenders/{}".format(self.indicators_host, item_id)
-        return self.request(url)
+        with self.tracer.span("item_details"):
+            return self.request(url)
 
     def get_tender_monitoring_list(self, tender_id):
         url = "{}tenders/{}/monitorings?mode=draft".format(self.monitors_host, tender_id)
-        response = self.request(
-            url,
-            headers={
-                "Authorization": "Bearer {}".format(self.monitors_token)
-            }
-        )
+        with self.tracer.span("monitoring_list"):
+            response = self.request(url)
         return response["data"]
 
+    def is_monitoring_indexed(self, tender_id):
+        return self.monitoring_index_enabled and tender_id in self.monitoring_index
+
+    def get_tender_monitoring_statuses(self, tender_id):
+        if self.monitoring_index_enabled:
+            monitorings = self.monitoring_index.get(tender_id)
+            if monitorings is not None:
+                self.process_stats["monitoring_index_hit"] += 1
+                return monitorings.values()
+            self.process_stats["monitoring_index_miss"] += 1
+
+        return [m["status"] for m in self.get_tender_monitoring_list(tender_id)]
+
+    def sync_monitoring_index(self):
+        """
+        Applies the monitorings changes feed since the previous sync to the local index,
+        the first sync loads the whole feed
+        """
+        started = time()
+        try:
+            while True:
+                url = "{}monitorings?mode=draft&feed=changes&opt_fields=tender_id%2Cstatus&limit={}".format(
+                    self.monitors_host,
+                    self.monitoring_index_limit
+                )
+                if self.monitoring_index_offset is not None:
+                    url += "&offset={}".format(quote_plus(str(self.monitoring_index_offset)))
+
+                response = self.request(url)
+                data = response["data"]
+                for monitoring in data:
+                    self.monitoring_index.setdefault(monitoring["tender_id"], {})[monitoring["id"]] = monitoring["status"]
+
+                self.monitoring_index_offset = response["next_page"]["offset"]
+                if len(data) < self.monitoring_index_limit:
+                    break
+        except Exception as e:
+            logger.exception(e)
+            logger.warning("Monitoring index sync failed, stale entries are used until the next sync")
+        self.tracer.add("monitoring_index_sync", started, time() - started)
+
     def start_monitoring(self, risk_info, details):
+        started = time()
         indicators_info = {i["indicatorId"]: i for i in details["indicatorsInfo"]}
 
         indicators = [(i["indicatorCode"], i["value"])
@@ -142,60 +854,388 @@ class RiskIndicatorBridge(object):
             logger.warning('Unable to match risk status "%s" to procuringStages: {}' % details['status'])
             stages = []
 
-        self.request(
-            "{}monitorings".format(self.monitors_host),
-            method="post",
-            json={
-                "data": {
-                    "tender_id": details["id"],
-                    "reasons": ["indicator"],
-                    "procuringStages": list(stages),
-                    "riskIndicators": [uid for uid, value in indicators if value == 1],
-                    "riskIndicatorsTotalImpact": risk_info.get("tenderScore"),
-                    "riskIndicatorsRegion": risk_info.get("region"),
-                }
-            },
-            headers={
-                "Authorization": "Bearer {}".format(self.monitors_token)
-            }
-        )
+        data = {
+            "tender_id": details["id"],
+            "reasons": ["indicator"],
+            "procuringStages": list(stages),
+            "riskIndicators": [uid for uid, value in indicators if value == 1],
+            "riskIndicatorsTotalImpact": risk_info.get("tenderScore"),
+            "riskIndicatorsRegion": risk_info.get("region"),
+        }
+        self.tracer.add("start_monitoring", started, time() - started)
+
+        if self.outbox is not None:
+            if self.outbox.put(details["id"], data):
+                self.process_stats["queued_to_outbox"] += 1
+        else:
+            self.create_monitoring(data)
+
+    def create_monitoring(self, data):
+        with self.tracer.span("monitoring_post"):
+            response = self.request(
+                "{}monitorings".format(self.monitors_host),
+                method="post",
+                json={"data": data},
+            )
+
+        if self.monitoring_index_enabled:
+            monitoring = response["data"]
+            self.monitoring_index.setdefault(data["tender_id"], {})[monitoring["id"]] = monitoring["status"]
 
         self.process_stats["created"] += 1
 
+    def run_outbox_sender(self):
+        while True:
+            try:
+                sent = self.send_outbox()
+            except Exception as e:
+                logger.exception(e)
+                sent = 0
+            if not sent:
+                sleep(self.outbox_interval)
+
+    def send_outbox(self):
+        """
+        Posts a batch of the outbox monitorings, a monitoring isn't posted again
+        if the tender has got a live monitoring since it was queued. Returns the number of the processed entries
+        """
+        entries = self.outbox.get_ready(self.outbox_batch_size, self.outbox_claim_ttl)
+        for tender_id, data, attempts in entries:
+            try:
+                monitorings = self.get_tender_monitoring_list(tender_id)
+                if any(m["status"] in self.skip_monitoring_statuses for m in monitorings):
+                    self.process_stats["outbox_skipped_existing"] += 1
+                else:
+                    self.create_monitoring(data)
+            except Exception as e:
+                logger.exception(e)
+                self.process_stats["outbox_failed"] += 1
+                rejected = isinstance(e, self.ClientErrorException) and e.status_code != 409
+                if rejected or attempts + 1 >= self.outbox_max_attempts:
+                    logger.error("Dropping the outbox monitoring for {} after {} attempts: {}".format(
+                        tender_id, attempts + 1, e))
+                    self.process_stats["outbox_dropped"] += 1
+                    self.outbox.delete(tender_id)
+                else:
+                    delay = get_backoff_delay(attempts + 1, self.outbox_interval, self.outbox_retry_max)
+                    self.outbox.reschedule(tender_id, delay)
+            else:
+                self.outbox.delete(tender_id)
+        return len(entries)
+
     # Helper methods #
 
     class TerminateExecutionException(Exception):
         pass
 
-    def request(self, url, method="get", **kwargs):
-        if url.startswith(self.indicators_host) and self.indicators_proxy:
+    class CircuitOpenException(TerminateExecutionException):
+        pass
+
+    class ClientErrorException(TerminateExecutionException):
+        def __init__(self, message, status_code):
+            super(RiskIndicatorBridge.ClientErrorException, self).__init__(message)
+            self.status_code = status_code
+
+    def get_host(self, url):
+        for host in (self.indicators_host, self.monitors_host):
+            if url.startswith(host):
+                return host
+        parsed = urlparse(url)
+        return "{}://{}/".format(parsed.scheme, parsed.netloc)
+
+    def get_session(self, url):
+        """
+        Returns a keep-alive session for the API host of the url,
+        so connections (and TLS handshakes) are reused between requests
+        """
+        host = self.get_host(url)
+        session = self.sessions.get(host)
+        if session is None:
+            session = self.sessions[host] = self.create_session(host)
+        return session
+
+    def create_session(self, host):
+        session = requests.Session()
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING if self.compression else "identity"
+
+        # every greenlet that may request the host at once gets its own keep-alive connection
+        pool_size = max(self.connection_pool_size, self.process_concurrency + self.queue_concurrency)
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        if host == self.monitors_host:
+            session.headers["Authorization"] = "Bearer {}".format(self.monitors_token)
+
+        return session
+
+    def run_proxy_prober(self):
+        while True:
+            sleep(self.proxy_probe_interval)
+            try:
+                self.probe_proxies()
+            except Exception as e:
+                logger.exception(e)
+
+    def probe_proxies(self):
+        """
+        Requests the regions list through every ejected proxy, readmits the ones it succeeds through
+        """
+        session = self.get_session(self.indicators_host)
+        url = "{}region-indicators-queue/regions/".format(self.indicators_host)
+        for proxy in self.proxy_pool.ejected:
+            try:
+                response = session.get(url, proxies=proxy.proxies, timeout=self.request_timeout)
+            except Exception as e:
+                logger.debug("Proxy probe failed: {}".format(e))
+            else:
+                if response.status_code == 200:
+                    self.proxy_pool.readmit(proxy)
+
+    def get_circuit_breaker(self, host):
+        breaker = self.circuit_breakers.get(host)
+        if breaker is None:
+            breaker = self.circuit_breakers[host] = CircuitBreaker(
+                self.circuit_breaker_threshold,
+                self.circuit_breaker_cooldown,
+            )
+        return breaker
+
+    def get_concurrency_limiter(self, host):
+        if not self.adaptive_concurrency:
+            return None
+
+        limiter = self.concurrency_limiters.get(host)
+        if limiter is None:
+            limiter = self.concurrency_limiters[host] = AIMDLimiter(
+                self.adaptive_concurrency_initial,
+                self.adaptive_concurrency_min,
+                self.adaptive_concurrency_max,
+                self.adaptive_latency_target,
+            )
+        return limiter
+
+    def get_rate_budget(self, host, method):
+        if host == self.indicators_host:
+            return "indicators"
+        elif host == self.monitors_host:
+            return "monitors_post" if method == "post" else "monitors"
+
+    def get_rates_summary(self):
+        summary = {}
+        for budget, rate_limiter in self.rate_limiters.items():
+            summary[budget] = {
+                "limit": rate_limiter.rate,
+                "effective": round(rate_limiter.effective_rate, 2),
+            }
+        for host, limiter in self.concurrency_limiters.items():
+            summary.setdefault(self.get_rate_budget(host, "get"), {})["concurrency"] = int(limiter.limit)
+        return summary
+
+    def get_endpoint(self, url, method):
+        """
+        Returns the upstream endpoint name the request metrics of the url are labeled with
+        """
+        host = self.get_host(url)
+        path = urlparse(url).path.rstrip("/")
+        if host == self.indicators_host:
+            if path.endswith("region-indicators-queue/regions"):
+                return "queue_regions"
+            elif path.endswith("region-indicators-queue"):
+                return "queue_page"
+            return "tender_details"
+        elif host == self.monitors_host:
+            if method == "post":
+                return "monitoring_post"
+            elif "/tenders/" in path:
+                return "monitorings_list"
+            return "monitorings_feed"
+        return "other"
+
+    def count_transfer(self, endpoint, response, decode_time):
+        content = response.content
+        decoded_size = len(content) if isinstance(content, bytes) else 0
+        size = get_wire_size(response) or decoded_size
+
+        stats = self.transfer_stats[endpoint]
+        stats["responses"] += 1
+        stats["bytes"] += size
+        stats["decoded_bytes"] += decoded_size
+        stats["decode_time"] += decode_time
+
+        self.metrics.response_bytes.inc(size, endpoint=endpoint)
+        self.metrics.decoded_bytes.inc(decoded_size, endpoint=endpoint)
+        self.metrics.decode_time.inc(decode_time, endpoint=endpoint)
+
+    def send(self, func, url, budget, limiter, endpoint="other", proxy=None, **kwargs):
+        """
+        Makes a single call waiting for the rate limit of the budget and a free concurrency limiter slot,
+        the limiter and the proxy stats are adjusted by the call latency and result
+        """
+        rate_limiter = self.rate_limiters.get(budget)
+        if rate_limiter is not None:
+            delay = rate_limiter.reserve()
+            if delay > 0:
+                with self.tracer.span("rate_limit_wait"):
+                    sleep(delay)
+
+        if limiter is not None:
+            limiter.acquire()
+        if proxy is not None:
+            kwargs["proxies"] = proxy.proxies
+            self.proxy_pool.start(proxy)
+        self.metrics.requests_in_flight.inc(endpoint=endpoint)
+        started, failed, cancelled = time(), True, False
+        try:
+            response = func(url, **kwargs)
+            failed = response.status_code == 429 or response.status_code >= 500
+            return response
+        except BaseException as e:
+            cancelled = not isinstance(e, Exception)  # the greenlet is killed, e.g. a prefetch that isn't needed
+            raise
+        finally:
+            latency = time() - started
+            self.metrics.requests_in_flight.dec(endpoint=endpoint)
+            self.metrics.request_latency.observe(latency, endpoint=endpoint)
+            if limiter is not None and cancelled:
+                limiter.cancel()
+            elif limiter is not None:
+                limiter.release(latency, failed=failed)
+            if proxy is not None and cancelled:
+                self.proxy_pool.cancel(proxy)
+            elif proxy is not None:
+                self.proxy_pool.finish(proxy, latency, failed)
+
+    def request(self, url, method="get", stream=None, **kwargs):
+        """
+        Returns the decoded json of a successful response or, with stream, the result of stream(response)
+        that reads the streamed body, its failures are retried as the invalid json ones.
+        Concurrent GETs of the same url share a single upstream request and its result, so it must not be modified
+        """
+        if method != "get" or stream is not None or kwargs or not self.coalesce_requests:
+            return self.make_request(url, method=method, stream=stream, **kwargs)
+
+        pending = self.pending_requests.get(url)
+        if pending is not None:
+            self.process_stats["requests_coalesced"] += 1
+            return pending.get()
+
+        pending = self.pending_requests[url] = AsyncResult()
+        try:
+            result = self.make_request(url)
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        except BaseException:  # the greenlet is killed
+            pending.set_exception(self.TerminateExecutionException("Request of {} is interrupted".format(url)))
+            raise
+        else:
+            pending.set(result)
+            return result
+        finally:
+            del self.pending_requests[url]
+
+    def is_cacheable(self, url, method):
+        """
+        Only the indicators API GETs are cached, a stale monitorings answer could start a duplicate monitoring
+        """
+        return method == "get" and self.response_cache is not None and self.get_host(url) == self.indicators_host
+
+    def make_request(self, url, method="get", stream=None, **kwargs):
+        cached = None
+        cacheable = stream is None and self.is_cacheable(url, method)
+        if stream is not None:
+            kwargs.update(stream=True)
+        elif cacheable:
+            cached = self.response_cache.get(url)
+            if cached is not None:
+                if self.response_cache.is_fresh(cached):
+                    self.process_stats["cache_hit"] += 1
+                    return cached.data
+
+                headers = dict(kwargs.get("headers") or {})
+                headers.update(self.response_cache.get_conditional_headers(cached))
+                kwargs["headers"] = headers
+
+        func = getattr(self.get_session(url), method)
+        if self.replayer is not None:
+            func = self.replayer.wrap(method, func)
+        elif self.recorder is not None:
+            func = self.recorder.wrap(method, func)
+        timeout = kwargs.pop("timeout", self.request_timeout)
+        host = self.get_host(url)
+        if host == self.indicators_host and self.indicators_proxy and self.proxy_pool is None:
+            # passed with every call as the session proxies are overridden by HTTP(S)_PROXY of the environment
             kwargs.update(proxies={
                 "http": self.indicators_proxy,
                 "https": self.indicators_proxy,
             })
+        breaker = self.get_circuit_breaker(host)
+        budget = self.get_rate_budget(host, method)
+        limiter = self.get_concurrency_limiter(host)
+        endpoint = self.get_endpoint(url, method)
+        attempt = 0
 
-        func = getattr(requests, method)
-        timeout = kwargs.pop("timeout", self.request_timeout)
-        tries = self.request_retries
+        while attempt < self.request_retries:
+            if breaker.is_open:
+                raise self.CircuitOpenException("Circuit is open for {}, skipping {} {}".format(host, method, url))
 
-        while tries:
+            retry_after = None
+            proxy = self.proxy_pool.pick() if self.proxy_pool is not None and host == self.indicators_host else None
             try:
-                response = func(url, timeout=timeout, **kwargs)
+                response = self.send(func, url, budget, limiter, endpoint=endpoint, proxy=proxy,
+                                     timeout=timeout, **kwargs)
             except Exception as e:
                 logger.exception(e)
+                self.metrics.request_errors.inc(endpoint=endpoint, status="exception")
+                breaker.failure()
             else:
                 status_ok = 201 if method == "post" else 200
-                if response.status_code == status_ok:
+                if cached is not None and response.status_code == 304:
+                    breaker.success()
+                    self.process_stats["cache_revalidated"] += 1
+                    return cached.data
+                elif response.status_code == status_ok:
                     try:
-                        json_res = response.json()
+                        started = time()
+                        if stream is not None:
+                            json_res = stream(response)
+                        else:
+                            with self.tracer.span("json_decode"):
+                                json_res = self.json_decoder.decode(response)
+                            self.count_transfer(endpoint, response, time() - started)
                     except Exception as e:
                         logger.exception(e)
+                        self.metrics.request_errors.inc(endpoint=endpoint, status="invalid_json")
+                        breaker.failure()
+                        if stream is not None and response.raw is not None:
+                            response.close()  # the rest of a broken stream isn't read
                     else:
+                        breaker.success()
+                        if cacheable:
+                            self.process_stats["cache_miss"] += 1
+                            self.response_cache.save(url, response, json_res)
                         return json_res
+                elif 400 <= response.status_code < 500 and response.status_code != 429:
+                    breaker.success()  # the host is fine, but the request won't succeed on retries
+                    logger.error("Unsuccessful response code: {}".format(response.status_code))
+                    self.metrics.request_errors.inc(endpoint=endpoint, status=response.status_code)
+                    raise self.ClientErrorException(
+                        "Unsuccessful response code {} for {} {}".format(response.status_code, method, url),
+                        response.status_code)
                 else:
                     logger.error("Unsuccessful response code: {}".format(response.status_code))
+                    self.metrics.request_errors.inc(endpoint=endpoint, status=response.status_code)
+                    breaker.failure()
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
 
-            sleep(self.request_retries - tries)
-            tries -= 1
+            attempt += 1
+            if attempt < self.request_retries:
+                self.metrics.request_retries.inc(endpoint=endpoint)
+                delay = get_backoff_delay(attempt, self.request_backoff, self.request_backoff_max)
+                if retry_after:  # capped, so a throttled API doesn't stall the greenlet for hours
+                    delay = max(delay, min(retry_after, self.request_backoff_max))
+                with self.tracer.span("retry_sleep"):
+                    sleep(delay)
 
         raise self.TerminateExecutionException("Access problems with {} {}".format(method, url))
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict, namedtuple
+from time import time
+
+
+class LRUCache(object):
+    """
+    Dict-like cache of a limited size, the least recently used keys are evicted first.
+    on_evict(key, value) is called for the evicted and the cleared entries, not for the popped ones
+    """
+
+    def __init__(self, size, on_evict=None):
+        self.size = size
+        self.on_evict = on_evict
+        self.data = OrderedDict()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __setitem__(self, key, value):
+        self.data.pop(key, None)
+        self.data[key] = value
+        while len(self.data) > self.size:
+            evicted = self.data.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(*evicted)
+
+    def get(self, key, default=None):
+        try:
+            value = self.data.pop(key)
+        except KeyError:
+            return default
+        self.data[key] = value
+        return value
+
+    def pop(self, key, default=None):
+        return self.data.pop(key, default)
+
+    def clear(self):
+        if self.on_evict is not None:
+            for key, value in self.data.items():
+                self.on_evict(key, value)
+        self.data.clear()
+
+
+CacheEntry = namedtuple("CacheEntry", ("data", "etag", "last_modified", "stored"))
+
+
+class ResponseCache(object):
+    """
+    Decoded GET responses by url. Responses with ETag or Last-Modified are revalidated
+    with a conditional request every time, the others are served without requests for ttl seconds
+    """
+
+    def __init__(self, size, ttl=0):
+        self.entries = LRUCache(size)
+        self.ttl = ttl
+
+    def get(self, url):
+        entry = self.entries.get(url)
+        if entry is not None and not (entry.etag or entry.last_modified or self.is_fresh(entry)):
+            self.entries.pop(url)  # expired and can't be revalidated
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return not (entry.etag or entry.last_modified) and time() - entry.stored < self.ttl
+
+    @staticmethod
+    def get_conditional_headers(entry):
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def save(self, url, response, data):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified or self.ttl:
+            self.entries[url] = CacheEntry(data, etag, last_modified, time())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from importlib import import_module
+import json
+import logging
+
+try:
+    from requests.packages.urllib3.util.request import ACCEPT_ENCODING  # includes br if brotli is installed
+except ImportError:
+    ACCEPT_ENCODING = "gzip,deflate"
+
+logger = logging.getLogger("RiskIndicatorBridge")
+
+JSON_DECODERS = ("orjson", "ujson", "json")
+
+
+def get_json_loads(name):
+    """
+    Returns the name and the loads function of the json decoder, "auto" picks the first installed of JSON_DECODERS
+    """
+    names = JSON_DECODERS if name == "auto" else (name,)
+    for module_name in names:
+        try:
+            module = import_module(module_name)
+        except ImportError:
+            continue
+        return module_name, module.loads
+
+    logger.warning("JSON decoder {} is not installed, stdlib json is used".format(name))
+    return "json", json.loads
+
+
+def get_wire_size(response):
+    """
+    Returns the number of the (compressed) body bytes read from the connection, None if it's unknown
+    """
+    try:
+        size = response.raw.tell()
+    except Exception:
+        return None
+    return size if isinstance(size, (int, long)) else None
+
+
+class JSONDecoder(object):
+    """
+    Decodes the response bodies with the picked json decoder,
+    the bodies it fails to decode are decoded again with stdlib json
+    """
+
+    def __init__(self, name="json"):
+        self.name, self.loads = get_json_loads(name)
+        self.fallbacks = 0
+
+    def decode(self, response):
+        if self.name == "json":
+            return response.json()
+
+        content = response.content
+        try:
+            return self.loads(content)
+        except (ValueError, TypeError) as e:
+            logger.warning("{} failed to decode a response, stdlib json is used: {}".format(self.name, e))
+            self.fallbacks += 1
+            return json.loads(content.decode(response.encoding or "utf-8"))
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Queue based logging: the records are put into a bounded buffer and a separate OS thread
+formats and writes them, so a slow stream or log collector doesn't stall the greenlets.
+logging.handlers of Python 2 has no QueueHandler and QueueListener, these are the local ones.
+The listener is a real thread even if threading is patched by gevent, the buffer is a deque
+which appends and pops are atomic, so neither side waits for the other
+"""
+from collections import deque
+from gevent.monkey import get_original
+from time import time
+import logging
+import atexit
+
+start_new_thread = get_original("thread", "start_new_thread")
+thread_sleep = get_original("time", "sleep")
+
+
+class LogQueue(object):
+    """
+    Bounded buffer of (record, handlers) with the listener thread that passes the records to their handlers.
+    Records that don't fit are dropped and counted, the number is logged once there is space again.
+    Only aggregate_limit identical warnings and errors (the same call site and message) per aggregate_interval
+    seconds are kept, the rest are counted and reported by a single record at the end of the interval
+    """
+
+    def __init__(self, size=10000, aggregate_interval=60, aggregate_limit=10, poll_interval=.05):
+        self.size = size
+        self.aggregate_interval = aggregate_interval
+        self.aggregate_limit = aggregate_limit
+        self.poll_interval = poll_interval
+        self.records = deque()
+        self.dropped = 0
+        self.reported_dropped = 0
+        self.suppressed = 0
+        self.windows = {}  # (call site, message) -> [started, records, suppressed, handlers]
+        self.windows_checked = time()
+        self.running = False
+        self.finished = False
+
+    def put(self, record, handlers):
+        now = time()
+        if now - self.windows_checked >= self.aggregate_interval:
+            self.flush_windows(now)
+
+        if self.is_suppressed(record, handlers, now):
+            return False
+
+        if self.dropped > self.reported_dropped and len(self.records) + 2 <= self.size:
+            self.records.append((self.make_record(
+                record.name, logging.WARNING, record.pathname, record.lineno,
+                "{} log records were dropped as the log queue was full".format(self.dropped - self.reported_dropped)
+            ), handlers))
+            self.reported_dropped = self.dropped
+
+        if len(self.records) >= self.size:
+            self.dropped += 1
+            return False
+
+        self.records.append((record, handlers))
+        return True
+
+    def is_suppressed(self, record, handlers, now):
+        if record.levelno < logging.WARNING or not self.aggregate_limit:
+            return False
+
+        key = (record.name, record.levelno, record.pathname, record.lineno, record.getMessage())
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.aggregate_interval:
+            if window is not None:
+                self.report_window(key, window)
+            window = self.windows[key] = [now, 0, 0, handlers]
+
+        window[1] += 1
+        if window[1] <= self.aggregate_limit:
+            return False
+
+        window[2] += 1
+        self.suppressed += 1
+        return True
+
+    def report_window(self, key, window):
+        started, _, suppressed, handlers = window
+        if suppressed:
+            name, levelno, pathname, lineno, message = key
+            self.records.append((self.make_record(
+                name, levelno, pathname, lineno,
+                u"{} identical records were suppressed in {} seconds: {}".format(
+                    suppressed, int(time() - started), message)
+            ), handlers))
+
+    def flush_windows(self, now=None):
+        """
+        Reports the suppressed records of the finished intervals, all of them if now is None
+        """
+        for key, window in self.windows.items():
+            if now is None or now - window[0] >= self.aggregate_interval:
+                self.report_window(key, window)
+                del self.windows[key]
+        self.windows_checked = now or time()
+
+    @staticmethod
+    def make_record(name, levelno, pathname, lineno, message):
+        return logging.LogRecord(name, levelno, pathname, lineno, message, None, None)
+
+    def start(self):
+        self.running = True
+        self.finished = False
+        start_new_thread(self.listen, ())
+
+    def listen(self):
+        try:
+            while True:
+                try:
+                    record, handlers = self.records.popleft()
+                except IndexError:
+                    if not self.running:
+                        return
+                    thread_sleep(self.poll_interval)
+                    continue
+
+                for handler in handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+        finally:
+            self.finished = True
+
+    def stop(self, timeout=5):
+        """
+        Reports the suppressed records and waits for the listener to write the buffer out
+        """
+        if not self.running:
+            return
+        self.flush_windows()
+        self.running = False
+        deadline = time() + timeout
+        while not self.finished and time() < deadline:
+            thread_sleep(self.poll_interval)
+
+
+class QueueHandler(logging.Handler):
+    """
+    Puts the records into the log queue for the handlers it replaces
+    """
+
+    def __init__(self, log_queue, handlers):
+        super(QueueHandler, self).__init__()
+        self.log_queue = log_queue
+        self.handlers = handlers
+
+    def prepare(self, record):
+        """
+        The message is merged with its arguments right away as they may change before the record is written,
+        the traceback is formatted by the listener
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.log_queue.put(self.prepare(record), self.handlers)
+        except Exception:
+            self.handleError(record)
+
+
+def setup_queue_logging(size=10000, aggregate_interval=60, aggregate_limit=10):
+    """
+    Moves the handlers of the root and all the other loggers behind QueueHandlers of a single log queue
+    """
+    log_queue = LogQueue(size, aggregate_interval, aggregate_limit)
+
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+    ]
+    for logger in loggers:
+        handlers = [handler for handler in logger.handlers if not isinstance(handler, QueueHandler)]
+        if handlers:
+            for handler in handlers:
+                logger.removeHandler(handler)
+            logger.addHandler(QueueHandler(log_queue, handlers))
+
+    log_queue.start()
+    atexit.register(log_queue.stop)
+    return log_queue
@@ -1,5 +1,6 @@
 #!/bin/python
-from openprocurement.bot.risk_indicators.bridge import RiskIndicatorBridge
+from gevent import monkey
+from openprocurement.bot.risk_indicators.log_queue import setup_queue_logging
 import logging
 import logging.config
 import yaml
@@ -9,7 +10,21 @@ import os
 logger = logging.getLogger("RiskIndicatorBridge")
 
 
+def get_engines():
+    """
+    Returns the bridge classes by the engine option values. They are imported on call,
+    so an entry point patches gevent before requests and ssl are imported
+    """
+    from openprocurement.bot.risk_indicators.bridge import RiskIndicatorBridge
+    from openprocurement.bot.risk_indicators.async_bridge import AsyncRiskIndicatorBridge
+    return {
+        "default": RiskIndicatorBridge,
+        "async": AsyncRiskIndicatorBridge,
+    }
+
+
 def main(config_path=None):
+    monkey.patch_all()
     if config_path is None:
         if len(sys.argv) < 2:
             logger.critical("Config is not provided")
@@ -28,8 +43,21 @@ def main(config_path=None):
         logger.critical(str(e))
         return
 
+    engines = get_engines()
     try:
+        main_config = config.get("main", {})
+        engine = main_config.get("engine", "default")
+        if engine not in engines:
+            logger.critical("Unknown engine: {}".format(engine))
+            return
+
         logging.config.dictConfig(config)
-        RiskIndicatorBridge(config).run()
+        if main_config.get("log_queue", False):
+            setup_queue_logging(
+                size=main_config.get("log_queue_size", 10000),
+                aggregate_interval=main_config.get("log_aggregate_interval", 60),
+                aggregate_limit=main_config.get("log_aggregate_limit", 10),
+            )
+        engines[engine](config).run()
     except Exception as e:
         logger.critical("Unhandled exception: {}".format(e))
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+from gevent.pywsgi import WSGIServer
+import logging
+
+logger = logging.getLogger("RiskIndicatorBridge")
+
+LATENCY_BUCKETS = (.05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, unicode(value).replace(u"\\", u"\\\\").replace(u'"', u'\\"').replace(u"\n", u"\\n"))
+        for name, value in labels
+    )
+    return u"{{{}}}".format(u",".join(u'{}="{}"'.format(name, value) for name, value in escaped))
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(object):
+    type = None
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.values = defaultdict(int)  # sorted label pairs -> value
+
+    @staticmethod
+    def get_key(labels):
+        return tuple(sorted(labels.items()))
+
+    def get(self, **labels):
+        return self.values.get(self.get_key(labels), 0)
+
+    def clear(self):
+        self.values.clear()
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, key, value
+
+    def render(self):
+        lines = [
+            u"# HELP {} {}".format(self.name, self.documentation),
+            u"# TYPE {} {}".format(self.name, self.type),
+        ]
+        for name, labels, value in self.samples():
+            lines.append(u"{}{} {}".format(name, format_labels(labels), format_value(value)))
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        self.values[self.get_key(labels)] += amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        self.values[self.get_key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        self.values[self.get_key(labels)] += amount
+
+    def dec(self, amount=1, **labels):
+        self.values[self.get_key(labels)] -= amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        super(Histogram, self).__init__(name, documentation)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self.get_key(labels)
+        observations = self.values.get(key)
+        if observations is None:
+            observations = self.values[key] = {"buckets": [0] * len(self.buckets), "sum": 0., "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                observations["buckets"][i] += 1
+        observations["sum"] += value
+        observations["count"] += 1
+
+    def get(self, **labels):
+        return self.values.get(self.get_key(labels))
+
+    def samples(self):
+        for key, observations in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, observations["buckets"]):
+                yield self.name + "_bucket", key + (("le", format_value(bound)),), count
+            yield self.name + "_sum", key, observations["sum"]
+            yield self.name + "_count", key, observations["count"]
+
+
+class Metrics(object):
+    """
+    Bridge metrics rendered in the Prometheus text exposition format
+    """
+
+    def __init__(self):
+        self.risks = Counter(
+            "risk_bridge_risks_total", "Risk processing events by the process_stats name")
+        self.request_latency = Histogram(
+            "risk_bridge_request_duration_seconds", "Upstream request attempt latency by endpoint")
+        self.request_errors = Counter(
+            "risk_bridge_request_errors_total", "Failed upstream request attempts by endpoint and status code")
+        self.request_retries = Counter(
+            "risk_bridge_request_retries_total", "Upstream request retries by endpoint")
+        self.requests_in_flight = Gauge(
+            "risk_bridge_requests_in_flight", "Upstream requests in progress by endpoint")
+        self.queue_page = Gauge(
+            "risk_bridge_queue_page", "Queue page being processed by region")
+        self.response_bytes = Counter(
+            "risk_bridge_response_bytes_total", "Response body bytes received by endpoint, compressed if it was")
+        self.decoded_bytes = Counter(
+            "risk_bridge_response_decoded_bytes_total", "Decompressed response body bytes by endpoint")
+        self.decode_time = Counter(
+            "risk_bridge_json_decode_seconds_total", "Time spent decoding json responses by endpoint")
+
+    def render(self):
+        lines = []
+        for metric in (self.risks, self.request_latency, self.request_errors, self.request_retries,
+                       self.requests_in_flight, self.queue_page, self.response_bytes, self.decoded_bytes,
+                       self.decode_time):
+            lines.extend(metric.render())
+        return u"\n".join(lines) + u"\n"
+
+    def wsgi_app(self, environ, start_response):
+        if environ.get("PATH_INFO") != "/metrics":
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"Not Found\n"]
+
+        start_response("200 OK", [("Content-Type", "text/plain; version=0.0.4; charset=utf-8")])
+        return [self.render().encode("utf-8")]
+
+    def serve(self, host, port):
+        server = WSGIServer((host, port), self.wsgi_app, log=None)
+        server.start()
+        logger.info("Metrics are served on http://{}:{}/metrics".format(host, port))
+        return server
+
+
+class ProcessStats(defaultdict):
+    """
+    process_stats dict that also adds its increments to the risks metrics counter
+    """
+
+    def __init__(self, counter):
+        super(ProcessStats, self).__init__(int)
+        self.counter = counter
+
+    def __setitem__(self, key, value):
+        delta = value - self.get(key, 0)
+        if delta > 0:
+            self.counter.inc(delta, stat=key)
+        super(ProcessStats, self).__setitem__(key, value)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+from time import time
+from urlparse import urlparse
+import logging
+
+logger = logging.getLogger("RiskIndicatorBridge")
+
+
+def hide_credentials(url):
+    parsed = urlparse(url)
+    if parsed.password is None and parsed.username is None:
+        return url
+    return url.replace(parsed.netloc, "***@{}".format(parsed.netloc.rsplit("@", 1)[-1]), 1)
+
+
+class Proxy(object):
+    __slots__ = ("url", "outstanding", "latency", "requests", "errors", "failures", "ejected")
+
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0  # requests in progress
+        self.latency = 0.  # moving average of the request latency
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0  # consecutive
+        self.ejected = None  # the time of the ejection
+
+    @property
+    def proxies(self):
+        return {"http": self.url, "https": self.url}
+
+
+class ProxyPool(object):
+    """
+    Proxies of the indicators API. Every request goes through the admitted proxy with the least requests
+    in progress or, with the latency strategy, with the lowest latency average. A proxy that fails
+    eject_threshold requests in a row is ejected until a probe through it succeeds.
+    If all the proxies are ejected they are all used, so the requests are not stopped by the probes
+    """
+    LEAST_OUTSTANDING = "least_outstanding"
+    LATENCY = "latency"
+
+    def __init__(self, urls, strategy=LEAST_OUTSTANDING, eject_threshold=3, latency_weight=.2):
+        self.proxies = [Proxy(url) for url in urls]
+        self.strategy = strategy
+        self.eject_threshold = eject_threshold
+        self.latency_weight = latency_weight
+
+    @property
+    def ejected(self):
+        return [proxy for proxy in self.proxies if proxy.ejected is not None]
+
+    def pick(self):
+        proxies = [proxy for proxy in self.proxies if proxy.ejected is None] or self.proxies
+        if self.strategy == self.LATENCY:
+            return min(proxies, key=lambda proxy: (proxy.latency, proxy.outstanding))
+        return min(proxies, key=lambda proxy: (proxy.outstanding, proxy.latency))
+
+    def start(self, proxy):
+        proxy.outstanding += 1
+
+    def finish(self, proxy, latency, failed):
+        proxy.outstanding -= 1
+        proxy.requests += 1
+        proxy.latency += self.latency_weight * (latency - proxy.latency)
+
+        if not failed:
+            proxy.failures = 0
+            return
+
+        proxy.errors += 1
+        proxy.failures += 1
+        if proxy.failures >= self.eject_threshold and proxy.ejected is None:
+            proxy.ejected = time()
+            logger.warning("Proxy {} is ejected after {} failures".format(hide_credentials(proxy.url), proxy.failures))
+
+    def cancel(self, proxy):
+        """
+        Ends a request that was interrupted, it's neither a success nor a failure of the proxy
+        """
+        proxy.outstanding -= 1
+
+    def readmit(self, proxy):
+        proxy.ejected = None
+        proxy.failures = 0
+        logger.info("Proxy {} is readmitted".format(hide_credentials(proxy.url)))
+
+    def reset_stats(self):
+        for proxy in self.proxies:
+            proxy.requests = 0
+            proxy.errors = 0
+
+    def get_summary(self):
+        return {
+            hide_credentials(proxy.url): {
+                "requests": proxy.requests,
+                "errors": proxy.errors,
+                "latency": round(proxy.latency, 3),
+                "ejected": proxy.ejected is not None,
+            }
+            for proxy in self.proxies
+        }
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict, deque
+from time import time, sleep
+from requests.structures import CaseInsensitiveDict
+import requests
+import gzip
+import json
+
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+def open_log(path, mode):
+    """
+    Recordings with the .gz extension are gzipped, appended runs are read as one file
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+class Recorder(object):
+    """
+    Appends every upstream call with its response and timing to a json lines file,
+    the secrets are replaced with *** in the recorded urls, request bodies and responses
+    """
+
+    def __init__(self, path, secrets=()):
+        self.path = path
+        self.secrets = [secret for secret in secrets if secret]
+        self.file = open_log(path, "ab")
+        self.started = time()
+
+    def redact(self, text):
+        for secret in self.secrets:
+            text = text.replace(secret, "***")
+        return text
+
+    def wrap(self, method, func):
+        """
+        Returns func that records its calls
+        """
+        def recorded(url, **kwargs):
+            started = time()
+            record = {
+                "t": round(started - self.started, 3),
+                "method": method,
+                "url": self.redact(url),
+            }
+            if kwargs.get("json") is not None:
+                record["json"] = json.loads(self.redact(json.dumps(kwargs["json"])))
+            try:
+                response = func(url, **kwargs)
+            except Exception as e:
+                record.update(elapsed=round(time() - started, 3), error=self.redact(str(e)))
+                self.write(record)
+                raise
+
+            body = response.content  # a streamed body is read here, iter_content gives it from memory then
+            record.update(
+                elapsed=round(time() - started, 3),
+                status=response.status_code,
+                headers={name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+                body=self.redact(body.decode("utf-8")) if body else u"",
+            )
+            self.write(record)
+            return response
+        return recorded
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Replayer(object):
+    """
+    Serves the recorded responses instead of the upstream APIs. The calls with the same method and url
+    get their recorded responses in the recorded order, the last one is repeated once they are over.
+    The recorded latency is reproduced divided by speed (0 - no delays).
+    With stub_posts the POSTs aren't looked up, they all get a new draft monitoring
+    """
+
+    def __init__(self, path, speed=0, stub_posts=True):
+        self.speed = speed
+        self.stub_posts = stub_posts
+        self.records = defaultdict(deque)  # (method, url) -> records
+        self.posts = 0
+        with open_log(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.records[(record["method"], record["url"])].append(record)
+
+    def wrap(self, method, func=None):
+        """
+        Returns a replaying stand-in of the session method
+        """
+        def replayed(url, **kwargs):
+            return self.replay(method, url)
+        return replayed
+
+    def replay(self, method, url):
+        if method == "post" and self.stub_posts:
+            self.posts += 1
+            data = {"data": {"id": "replay-{}".format(self.posts), "status": "draft"}}
+            return self.build_response(url, 201, {"Content-Type": "application/json"}, json.dumps(data))
+
+        records = self.records.get((method, url))
+        if not records:
+            return self.build_response(url, 404, {}, u"")
+
+        record = records[0] if len(records) == 1 else records.popleft()
+        if self.speed and record["elapsed"]:
+            sleep(record["elapsed"] / float(self.speed))
+
+        if "error" in record:
+            raise requests.ConnectionError(record["error"])
+        return self.build_response(url, record["status"], record["headers"], record["body"])
+
+    @staticmethod
+    def build_response(url, status, headers, body):
+        response = requests.Response()
+        response.url = url
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = "utf-8"
+        response._content = body.encode("utf-8")
+        response._content_consumed = True  # iter_content of a streamed call serves the body from memory
+        return response
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+from random import uniform
+from time import time
+
+
+class RegionState(object):
+    __slots__ = ("interval", "next_poll", "snapshot", "new_snapshot")
+
+    def __init__(self, interval, next_poll):
+        self.interval = interval
+        self.next_poll = next_poll
+        self.snapshot = {}  # tenderOuterId -> (tenderScore, topRisk) seen by the last poll
+        self.new_snapshot = {}
+
+
+class RegionScheduler(object):
+    """
+    Polling plan of the queue regions. Every region has its own interval that is halved
+    after a poll that found new or changed risks and grows by a half after a poll that didn't,
+    within min_interval and max_interval. The next poll times are spread by +/- jitter share of the interval
+    """
+
+    def __init__(self, min_interval, max_interval, jitter=.1):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.regions = {}
+
+    def set_regions(self, regions):
+        """
+        Adds the new regions with their first polls spread over min_interval, drops the missing ones
+        """
+        now = time()
+        for region in regions:
+            if region not in self.regions:
+                self.regions[region] = RegionState(self.min_interval, now + uniform(0, self.min_interval))
+        for region in set(self.regions) - set(regions):
+            del self.regions[region]
+
+    def get_next(self):
+        """
+        Returns the region to poll next and the seconds to wait until its poll
+        """
+        region, state = min(self.regions.items(), key=lambda item: item[1].next_poll)
+        return region, max(0, state.next_poll - time())
+
+    def start_poll(self, region):
+        self.regions[region].new_snapshot = {}
+
+    def is_changed(self, region, risk):
+        """
+        True if the risk is new or changed since the previous poll of the region
+        """
+        values = (risk.get("tenderScore"), bool(risk["topRisk"]))
+        return self.regions[region].snapshot.get(risk["tenderOuterId"]) != values
+
+    def mark_seen(self, region, risk):
+        """
+        Adds the risk to the snapshot the next poll of the region is compared with
+        """
+        values = (risk.get("tenderScore"), bool(risk["topRisk"]))
+        self.regions[region].new_snapshot[risk["tenderOuterId"]] = values
+
+    def finish_poll(self, region, changed):
+        state = self.regions[region]
+        state.snapshot, state.new_snapshot = state.new_snapshot, {}
+
+        if changed:
+            state.interval = max(self.min_interval, state.interval / 2.)
+        else:
+            state.interval = min(self.max_interval, state.interval * 1.5)
+        state.next_poll = time() + state.interval * uniform(1 - self.jitter, 1 + self.jitter)
+
+    def fail_poll(self, region, delay):
+        """
+        Keeps the previous snapshot of the region and retries it after delay seconds
+        """
+        state = self.regions[region]
+        state.new_snapshot = {}
+        state.next_poll = time() + delay
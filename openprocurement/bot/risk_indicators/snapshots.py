@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar snapshots of the processed queue, one .npz file per run, and their vectorized analytics.
+numpy is an optional dependency, the snapshots are disabled without it
+"""
+from array import array
+from collections import namedtuple
+from datetime import datetime
+from hashlib import md5
+from openprocurement.bot.risk_indicators.storage import ProcessedTenderStore
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+UNCHANGED = "unchanged"
+FAILED = "failed"
+OUTCOMES = (
+    ProcessedTenderStore.CREATED,
+    ProcessedTenderStore.LIVE_MONITORING,
+    ProcessedTenderStore.NOT_TOP_RISK,
+    UNCHANGED,
+    FAILED,
+)
+FIELDS = ("tender_id", "tender_key", "region", "regions", "score", "top_risk", "outcome")
+
+
+def get_tender_key(tender_id):
+    """
+    64 bit key of the id, the snapshots are matched by the keys as sorting numbers is much faster than strings
+    """
+    return int(md5(tender_id).hexdigest()[:16], 16)
+
+
+class SnapshotWriter(object):
+    """
+    Collects the processed risks of a run in compact columns
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tender_ids = []
+        self.regions = {}  # name -> code
+        self.region_codes = array("H")
+        self.scores = array("d")
+        self.top_risks = array("b")
+        self.outcomes = array("b")
+
+    def __len__(self):
+        return len(self.tender_ids)
+
+    def add(self, risk, outcome):
+        tender_id = risk["tenderOuterId"]
+        if not isinstance(tender_id, bytes):
+            tender_id = tender_id.encode("utf-8")
+        score = risk.get("tenderScore")
+
+        self.tender_ids.append(tender_id)
+        self.region_codes.append(self.regions.setdefault(risk.get("region") or u"", len(self.regions)))
+        self.scores.append(float("nan") if score is None else score)
+        self.top_risks.append(bool(risk["topRisk"]))
+        self.outcomes.append(OUTCOMES.index(outcome))
+
+    def get_snapshot(self):
+        """
+        The rows are sorted by tender_key, so the snapshots are compared without sorting
+        """
+        tender_keys = np.array([get_tender_key(tender_id) for tender_id in self.tender_ids], dtype=np.uint64)
+        order = np.argsort(tender_keys)
+        return Snapshot(
+            tender_id=np.array(self.tender_ids, dtype=bytes)[order],
+            tender_key=tender_keys[order],
+            region=np.array(self.region_codes, dtype=np.uint16)[order],
+            regions=np.array(sorted(self.regions, key=self.regions.get), dtype=unicode),
+            score=np.array(self.scores, dtype=np.float64)[order],
+            top_risk=np.array(self.top_risks, dtype=bool)[order],
+            outcome=np.array(self.outcomes, dtype=np.int8)[order],
+        )
+
+    def save(self, path):
+        snapshot = self.get_snapshot()
+        np.savez_compressed(path, **{field: getattr(snapshot, field) for field in FIELDS})
+        return snapshot
+
+
+class Snapshot(object):
+    """
+    Columns of a run snapshot sorted by tender_key, region holds the indexes of the names in regions
+    and outcome the indexes of OUTCOMES
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, tender_id, tender_key, region, regions, score, top_risk, outcome):
+        self.tender_id = tender_id
+        self.tender_key = tender_key
+        self.region = region
+        self.regions = regions
+        self.score = score
+        self.top_risk = top_risk
+        self.outcome = outcome
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{field: data[field] for field in FIELDS})
+
+    def __len__(self):
+        return len(self.tender_id)
+
+
+class SnapshotDir(object):
+    """
+    Run snapshots saved in a directory, named by their time, only the keep latest are kept
+    """
+
+    def __init__(self, path, keep=30):
+        self.path = path
+        self.keep = keep
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def list(self):
+        return sorted(name for name in os.listdir(self.path) if name.startswith("snapshot-") and name.endswith(".npz"))
+
+    def get_latest(self):
+        names = self.list()
+        if names:
+            return Snapshot.load(os.path.join(self.path, names[-1]))
+
+    def save(self, writer):
+        """
+        Returns the path and the saved snapshot
+        """
+        path = os.path.join(self.path, "snapshot-{}.npz".format(datetime.now().strftime("%Y%m%d-%H%M%S-%f")))
+        snapshot = writer.save(path)
+        for name in self.list()[:-self.keep]:
+            os.remove(os.path.join(self.path, name))
+        return path, snapshot
+
+
+Diff = namedtuple("Diff", ("new", "changed", "unchanged", "removed", "old_index"))
+
+
+def diff(old, new):
+    """
+    Compares the risks of two snapshots by tender. Returns the masks of the new snapshot rows
+    that are new, changed (tenderScore or topRisk) and unchanged, the mask of the old snapshot rows
+    that are removed and the index of the old row of every new one (valid where it's not new)
+    """
+    if not len(old):
+        none = np.zeros(len(new), dtype=bool)
+        return Diff(new=~none, changed=none, unchanged=none, removed=none[:0], old_index=np.zeros(len(new), np.intp))
+
+    old_index = np.minimum(np.searchsorted(old.tender_key, new.tender_key), len(old) - 1)
+    found = old.tender_key[old_index] == new.tender_key
+
+    old_scores = old.score[old_index]
+    same_score = (old_scores == new.score) | (np.isnan(old_scores) & np.isnan(new.score))
+    unchanged = found & same_score & (old.top_risk[old_index] == new.top_risk)
+
+    removed = np.ones(len(old), dtype=bool)
+    removed[old_index[found]] = False
+    return Diff(new=~found, changed=found & ~unchanged, unchanged=unchanged, removed=removed, old_index=old_index)
+
+
+def count_by_region(snapshot, mask=None, weights=None):
+    region = snapshot.region if mask is None else snapshot.region[mask]
+    if weights is not None and mask is not None:
+        weights = weights[mask]
+    return np.bincount(region, weights=weights, minlength=len(snapshot.regions))
+
+
+def summarize(new, old=None, percentiles=(50, 90, 99)):
+    """
+    Returns the number of the risks and the top ones, the top risks share and the tenderScore percentiles
+    by region and, if the previous snapshot is given, the number of the new, changed and removed risks
+    """
+    counts = count_by_region(new)
+    top_counts = count_by_region(new, weights=new.top_risk)
+
+    # the scores grouped by region, so every region is a slice
+    sorted_scores = new.score[np.argsort(new.region, kind="mergesort")]
+    ends = np.cumsum(counts)
+
+    if old is not None:
+        changes = diff(old, new)
+        new_counts = count_by_region(new, changes.new)
+        changed_counts = count_by_region(new, changes.changed)
+        old_removed = count_by_region(old, changes.removed)
+        removed_counts = {name: int(old_removed[code]) for code, name in enumerate(old.regions)}
+
+    summary = {}
+    for code, name in enumerate(new.regions):
+        scores = sorted_scores[ends[code] - counts[code]:ends[code]]
+        scores = scores[~np.isnan(scores)]
+        region = summary[name] = {
+            "risks": int(counts[code]),
+            "top_risks": int(top_counts[code]),
+            "top_share": round(float(top_counts[code]) / counts[code], 4) if counts[code] else 0,
+            "score_percentiles": dict(zip(
+                percentiles,
+                [round(float(value), 4) for value in np.percentile(scores, percentiles)]
+            )) if len(scores) else {},
+        }
+        if old is not None:
+            region.update(
+                new=int(new_counts[code]),
+                changed=int(changed_counts[code]),
+                removed=removed_counts.pop(name, 0),
+            )
+
+    if old is not None:
+        for name, removed in removed_counts.items():  # the regions that are gone from the queue
+            if removed:
+                summary[name] = {"risks": 0, "top_risks": 0, "new": 0, "changed": 0, "removed": removed}
+    return summary
+
+
+def get_skip_list(snapshot):
+    """
+    Returns tenderScore and topRisk by tender id of the risks a monitoring was created for,
+    the next run can skip them if they are unchanged
+    """
+    created = np.flatnonzero(snapshot.outcome == OUTCOMES.index(ProcessedTenderStore.CREATED))
+    return {
+        snapshot.tender_id[i].decode("utf-8"): (
+            None if np.isnan(snapshot.score[i]) else float(snapshot.score[i]),
+            bool(snapshot.top_risk[i]),
+        )
+        for i in created
+    }
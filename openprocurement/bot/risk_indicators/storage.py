@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+from time import time
+from uuid import uuid4
+import sqlite3
+import json
+
+
+class SQLiteStore(object):
+    """
+    Base class for the bridge state kept in a local SQLite file,
+    every store creates its own tables in the file on init
+    """
+    schema = ()
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.schema:
+            self.connection.execute(statement)
+
+    def close(self):
+        self.connection.close()
+
+
+class ProcessedTenderStore(SQLiteStore):
+    """
+    Outcomes of the processed risks by tenderOuterId,
+    so the next runs can skip the tenders which risk values have not changed
+    """
+    CREATED = "created"
+    LIVE_MONITORING = "live_monitoring"
+    NOT_TOP_RISK = "not_top_risk"
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS processed_tenders ("
+        "tender_id TEXT PRIMARY KEY, outcome TEXT, tender_score REAL, top_risk INTEGER, updated REAL)",
+    )
+
+    def __init__(self, path, ttl):
+        super(ProcessedTenderStore, self).__init__(path)
+        self.ttl = ttl
+
+    def get(self, tender_id):
+        row = self.connection.execute(
+            "SELECT outcome, tender_score, top_risk, updated FROM processed_tenders WHERE tender_id = ?",
+            (tender_id,)
+        ).fetchone()
+        if row is not None:
+            outcome, tender_score, top_risk, updated = row
+            return dict(outcome=outcome, tender_score=tender_score, top_risk=bool(top_risk), updated=updated)
+
+    def is_unchanged(self, risk):
+        """
+        True if the tender was processed less than ttl seconds ago with the same tenderScore and topRisk
+        """
+        entry = self.get(risk["tenderOuterId"])
+        return (
+            entry is not None
+            and time() - entry["updated"] < self.ttl
+            and entry["tender_score"] == risk.get("tenderScore")
+            and entry["top_risk"] == bool(risk["topRisk"])
+        )
+
+    def save(self, risk, outcome):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO processed_tenders VALUES (?, ?, ?, ?, ?)",
+            (risk["tenderOuterId"], outcome, risk.get("tenderScore"), bool(risk["topRisk"]), time())
+        )
+
+
+class CheckpointStore(SQLiteStore):
+    """
+    Queue scan positions (the last completed page of every region) of the runs,
+    so a failed or restarted run continues from where it stopped.
+    Runs are kept per shard, so the shards may share the file
+    """
+    schema = (
+        "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, shard_id TEXT, started REAL, finished INTEGER)",
+        "CREATE TABLE IF NOT EXISTS checkpoints ("
+        "run_id TEXT, region TEXT, page INTEGER, done INTEGER, PRIMARY KEY (run_id, region))",
+    )
+
+    def start_run(self, window, shard_id):
+        """
+        Returns the id of the shard's unfinished run started less than window seconds ago
+        or starts a new run, the checkpoints of the shard's older runs are dropped
+        """
+        row = self.connection.execute(
+            "SELECT run_id FROM runs WHERE shard_id = ? AND finished = 0 AND started > ? "
+            "ORDER BY started DESC LIMIT 1",
+            (shard_id, time() - window)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        run_id = uuid4().hex
+        self.connection.execute(
+            "DELETE FROM checkpoints WHERE run_id IN (SELECT run_id FROM runs WHERE shard_id = ?)", (shard_id,))
+        self.connection.execute("DELETE FROM runs WHERE shard_id = ?", (shard_id,))
+        self.connection.execute("INSERT INTO runs VALUES (?, ?, ?, 0)", (run_id, shard_id, time()))
+        return run_id
+
+    def finish_run(self, run_id):
+        self.connection.execute("UPDATE runs SET finished = 1 WHERE run_id = ?", (run_id,))
+
+    def get_next_page(self, run_id, region):
+        """
+        Returns the page to continue the region scan from or None if the region is done
+        """
+        row = self.connection.execute(
+            "SELECT page, done FROM checkpoints WHERE run_id = ? AND region = ?",
+            (run_id, region)
+        ).fetchone()
+        if row is None:
+            return 0
+        page, done = row
+        if not done:
+            return page + 1
+
+    def save_page(self, run_id, region, page, done):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+            (run_id, region, page, done)
+        )
+
+
+class MonitoringOutbox(SQLiteStore):
+    """
+    Monitoring creation payloads waiting to be posted, one per tender
+    """
+    schema = (
+        "CREATE TABLE IF NOT EXISTS outbox ("
+        "tender_id TEXT PRIMARY KEY, payload TEXT, attempts INTEGER, next_attempt REAL, created REAL)",
+    )
+
+    def put(self, tender_id, payload):
+        """
+        Returns False if a payload for the tender is already waiting
+        """
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO outbox VALUES (?, ?, 0, ?, ?)",
+            (tender_id, json.dumps(payload), time(), time())
+        )
+        return cursor.rowcount > 0
+
+    def get_ready(self, limit, ttl):
+        """
+        Claims and returns up to limit (tender_id, payload, attempts) due to be sent, the oldest first.
+        The claimed entries aren't returned again for ttl seconds unless rescheduled,
+        so the shards sharing the outbox don't send the same payload
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.connection.execute(
+                "SELECT tender_id, payload, attempts FROM outbox WHERE next_attempt <= ? ORDER BY created LIMIT ?",
+                (time(), limit)
+            ).fetchall()
+            self.connection.executemany(
+                "UPDATE outbox SET next_attempt = ? WHERE tender_id = ?",
+                [(time() + ttl, tender_id) for tender_id, _, _ in rows]
+            )
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return [(tender_id, json.loads(payload), attempts) for tender_id, payload, attempts in rows]
+
+    def reschedule(self, tender_id, delay):
+        self.connection.execute(
+            "UPDATE outbox SET attempts = attempts + 1, next_attempt = ? WHERE tender_id = ?",
+            (time() + delay, tender_id)
+        )
+
+    def delete(self, tender_id):
+        self.connection.execute("DELETE FROM outbox WHERE tender_id = ?", (tender_id,))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+
+class LeaseStore(SQLiteStore):
+    """
+    Region leases and heartbeats of the bridge shards, kept in a file shared by all of them
+    """
+    schema = (
+        "CREATE TABLE IF NOT EXISTS leases (region TEXT PRIMARY KEY, owner TEXT, expires REAL)",
+        "CREATE TABLE IF NOT EXISTS shards ("
+        "shard_id TEXT PRIMARY KEY, shard_index INTEGER, heartbeat REAL, stats TEXT)",
+    )
+
+    def heartbeat(self, shard_id, shard_index):
+        self.connection.execute(
+            "INSERT OR IGNORE INTO shards VALUES (?, ?, ?, '{}')",
+            (shard_id, shard_index, time())
+        )
+        self.connection.execute(
+            "UPDATE shards SET shard_index = ?, heartbeat = ? WHERE shard_id = ?",
+            (shard_index, time(), shard_id)
+        )
+
+    def get_live_shards(self, ttl):
+        """
+        Returns the indexes of the shards that have sent a heartbeat during the last ttl seconds
+        """
+        rows = self.connection.execute("SELECT shard_index FROM shards WHERE heartbeat > ?", (time() - ttl,))
+        return {shard_index for shard_index, in rows}
+
+    def acquire(self, region, owner, ttl):
+        """
+        Takes or renews the lease of the region for ttl seconds, returns False if another owner holds it
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute("SELECT owner, expires FROM leases WHERE region = ?", (region,)).fetchone()
+            acquired = row is None or row[0] == owner or row[1] < time()
+            if acquired:
+                self.connection.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (region, owner, time() + ttl))
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return acquired
+
+    def release(self, region, owner):
+        self.connection.execute("DELETE FROM leases WHERE region = ? AND owner = ?", (region, owner))
+
+    def save_stats(self, shard_id, stats):
+        self.connection.execute("UPDATE shards SET stats = ? WHERE shard_id = ?", (json.dumps(stats), shard_id))
+
+    def get_stats(self):
+        """
+        Returns the last run stats of every shard and their sums
+        """
+        stats = {
+            shard_id: json.loads(shard_stats)
+            for shard_id, shard_stats in self.connection.execute("SELECT shard_id, stats FROM shards")
+        }
+        merged = defaultdict(int)
+        for shard_stats in stats.values():
+            for key, value in shard_stats.items():
+                merged[key] += value
+        return stats, dict(merged)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from codecs import getincrementaldecoder
+import json
+import re
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class RiskRecord(object):
+    """
+    Compact queue entry that keeps only the fields used by the bridge,
+    supports the dict-style access the bridge uses for the queue entries
+    """
+    __slots__ = ("tenderId", "tenderOuterId", "topRisk", "tenderScore", "region")
+
+    def __init__(self, tenderId=None, tenderOuterId=None, topRisk=False, tenderScore=None, region=None):
+        self.tenderId = tenderId
+        self.tenderOuterId = tenderOuterId
+        self.topRisk = topRisk
+        self.tenderScore = tenderScore
+        self.region = region
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(*(data.get(field) for field in cls.__slots__))
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        return isinstance(other, RiskRecord) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "RiskRecord({})".format(self.as_dict())
+
+
+class JSONObjectStream(object):
+    """
+    Incremental parser of a JSON object read from chunks of bytes.
+    Iterating yields (key, value) pairs of the object members; the items of the array member named array_key
+    are yielded one by one as (array_key, item) pairs while the rest of the object is still being read
+    """
+
+    def __init__(self, chunks, array_key, encoding="utf-8"):
+        self.chunks = iter(chunks)
+        self.array_key = array_key
+        self.text_decoder = getincrementaldecoder(encoding)()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = u""
+        self.pos = 0
+        self.eof = False
+
+    def read_more(self):
+        """
+        Appends the next chunk to the unparsed part of the buffer, returns False if there is nothing to append
+        """
+        if self.eof:
+            return False
+        try:
+            text = self.text_decoder.decode(next(self.chunks))
+        except StopIteration:
+            self.eof = True
+            text = self.text_decoder.decode(b"", final=True)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return bool(text) or not self.eof
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next char without consuming it, None at the end of the stream
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return None
+
+    def expect(self, chars):
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError("Expected one of '{}' at {!r}".format(chars, self.buffer[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def read_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self.read_more():
+                    raise
+            else:
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or not self.read_more():
+                    self.pos = end
+                    return value
+
+    def __iter__(self):
+        self.expect("{")
+        if self.peek() == "}":
+            return
+
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            if key == self.array_key and self.peek() == "[":
+                self.expect("[")
+                if self.peek() == "]":
+                    self.expect("]")
+                else:
+                    while True:
+                        yield key, self.read_value()
+                        if self.expect(",]") == "]":
+                            break
+            else:
+                yield key, self.read_value()
+
+            if self.expect(",}") == "}":
+                return
+
+
+class StreamedQueuePage(object):
+    """
+    Queue page read from a stream. get("data") yields RiskRecords as they are parsed,
+    the other members are available after the data is consumed
+    """
+
+    def __init__(self, chunks):
+        self.members = iter(JSONObjectStream(chunks, "data"))
+        self.fields = {}
+
+    def iter_data(self):
+        for key, value in self.members:
+            if key == "data":
+                yield RiskRecord.from_dict(value)
+            else:
+                self.fields[key] = value
+
+    def load(self):
+        """
+        Reads the whole page into compact records, so the connection is released before the risks are processed
+        """
+        self.fields["data"] = list(self.iter_data())
+        return self
+
+    def get(self, key, default=None):
+        if key == "data" and "data" not in self.fields:
+            return self.iter_data()
+
+        for _ in self.iter_data():  # the rest of the page
+            pass
+        return self.fields.get(key, default)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.async_bridge import AsyncRiskIndicatorBridge
+import unittest
+import mock
+
+
+class AsyncBridgeTest(unittest.TestCase):
+
+    config = {
+        "main": {
+            "indicators_host": "http://indicators/api/",
+            "monitors_host": "http://monitors/api/",
+            "monitors_token": "1" * 32,
+            "queue_concurrency": 2,
+        }
+    }
+
+    def test_defaults(self):
+        bridge = AsyncRiskIndicatorBridge(self.config)
+
+        self.assertEqual(bridge.process_concurrency, 1000)
+        self.assertEqual(bridge.queue_concurrency, 2)  # set in the config
+        self.assertTrue(bridge.queue_streaming)
+        self.assertFalse(bridge.prefetch_details)  # not switched on by the preset
+        self.assertNotIn("process_concurrency", self.config["main"])
+
+        session = bridge.get_session(bridge.indicators_host)
+        self.assertEqual(session.get_adapter(bridge.indicators_host)._pool_maxsize, 1002)
+
+    @mock.patch("openprocurement.bot.risk_indicators.async_bridge.RiskIndicatorBridge.process_risk")
+    @mock.patch("openprocurement.bot.risk_indicators.async_bridge.RiskIndicatorBridge.iter_risks")
+    def test_process_risks(self, iter_risks_mock, process_risk_mock):
+        iter_risks_mock.return_value = iter(range(3000))
+
+        bridge = AsyncRiskIndicatorBridge(self.config)
+        bridge.process_risks()
+
+        self.assertEqual(process_risk_mock.call_count, 3000)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from gevent import monkey
+monkey.patch_all()  # the bridge talks to the simulator served by the same process
+
+from openprocurement.bot.risk_indicators.benchmark import APISimulator, run_scenario
+from urllib import quote_plus
+import unittest
+import json
+
+
+class APISimulatorTest(unittest.TestCase):
+
+    def test_handle(self):
+        simulator = APISimulator(regions=2, pages=2, risks_per_page=3, live_monitoring_ratio=0)
+
+        status, _, regions = simulator.handle("GET", "/indicators/region-indicators-queue/regions/", "")
+        self.assertEqual((status, len(regions)), (200, 2))
+
+        query = "region={}&limit=4&page=1".format(quote_plus(regions[1].encode("utf-8")))
+        status, _, page = simulator.handle("GET", "/indicators/region-indicators-queue/", query)
+        self.assertEqual(len(page["data"]), 2)
+        self.assertEqual(page["pagination"], {"totalPages": 2})
+
+        risk = page["data"][0]
+        status, _, details = simulator.handle("GET", "/indicators/tenders/" + risk["tenderId"], "")
+        self.assertEqual(details["id"], risk["tenderOuterId"])
+
+        body = json.dumps({"data": {"tender_id": risk["tenderOuterId"]}})
+        status, _, _ = simulator.handle("POST", "/audit/monitorings", "", body)
+        self.assertEqual(status, 201)
+        status, _, monitorings = simulator.handle(
+            "GET", "/audit/tenders/{}/monitorings".format(risk["tenderOuterId"]), "mode=draft")
+        self.assertEqual([m["status"] for m in monitorings["data"]], ["draft"])
+        status, _, feed = simulator.handle("GET", "/audit/monitorings", "feed=changes&limit=10&offset=0")
+        self.assertEqual(feed["next_page"], {"offset": 1})
+
+        status, _, _ = simulator.handle("GET", "/audit/unknown", "")
+        self.assertEqual(status, 404)
+        self.assertEqual(simulator.request_counts["monitorings_list"], 1)
+        self.assertEqual(simulator.request_counts["other"], 1)
+
+    def test_injected_failures(self):
+        simulator = APISimulator(regions=1, throttle_ratio=1, retry_after=7)
+        status, headers, _ = simulator.handle("GET", "/indicators/region-indicators-queue/regions/", "")
+        self.assertEqual((status, headers), (429, {"Retry-After": "7"}))
+
+        simulator = APISimulator(regions=1, error_ratio=1)
+        status, _, _ = simulator.handle("GET", "/indicators/region-indicators-queue/regions/", "")
+        self.assertEqual(status, 503)
+
+    def test_run_scenario(self):
+        simulator = APISimulator(regions=2, pages=2, risks_per_page=5, top_risk_ratio=.5)
+        server = simulator.serve()
+        self.addCleanup(server.stop)
+
+        result = run_scenario(simulator, "concurrent", {"process_concurrency": 4}, {"queue_limit": 5})
+
+        self.assertEqual(result["risks"], 20)
+        self.assertEqual(result["requests"]["queue_page"], 4)
+        self.assertEqual(result["requests"]["monitoring_post"], result["stats"]["created"])
+        self.assertGreater(result["risks_per_sec"], 0)
+        self.assertGreater(result["peak_rss_mb"], 0)
+
+        result = run_scenario(simulator, "async", {"engine": "async"}, {"queue_limit": 5})
+        self.assertEqual(result["risks"], 20)
+        self.assertEqual(result["requests"]["queue_page"], 4)
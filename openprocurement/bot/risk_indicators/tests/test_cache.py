@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.cache import LRUCache, ResponseCache
+import unittest
+import mock
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(cache.get("a"), 1)  # "b" is the least recently used now
+
+        cache["c"] = 3
+
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertIsNone(cache.get("b"))
+
+    def test_pop_clear(self):
+        cache = LRUCache(2)
+        cache["a"] = 1
+        self.assertEqual(cache.pop("a"), 1)
+        self.assertIsNone(cache.pop("a"))
+
+        cache["b"] = 2
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_on_evict(self):
+        on_evict = mock.Mock()
+        cache = LRUCache(2, on_evict=on_evict)
+        for key in "abc":
+            cache[key] = key.upper()
+        on_evict.assert_called_once_with("a", "A")
+
+        cache.pop("b")
+        cache.clear()
+        self.assertEqual(on_evict.call_args_list, [mock.call("a", "A"), mock.call("c", "C")])
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_validators(self):
+        cache = ResponseCache(10)
+        response = mock.Mock(headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        cache.save("http://localhost/1", response, {"id": 1})
+
+        entry = cache.get("http://localhost/1")
+        self.assertEqual(entry.data, {"id": 1})
+        self.assertFalse(cache.is_fresh(entry))
+        self.assertEqual(
+            cache.get_conditional_headers(entry),
+            {"If-None-Match": '"abc"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+
+    def test_ttl(self):
+        cache = ResponseCache(10)
+        cache.save("http://localhost/1", mock.Mock(headers={}), {"id": 1})
+        self.assertIsNone(cache.get("http://localhost/1"))  # neither validators nor ttl
+
+        cache = ResponseCache(10, ttl=60)
+        cache.save("http://localhost/1", mock.Mock(headers={}), {"id": 1})
+        self.assertTrue(cache.is_fresh(cache.get("http://localhost/1")))
+
+        with mock.patch("openprocurement.bot.risk_indicators.cache.time", return_value=10 ** 10):
+            self.assertIsNone(cache.get("http://localhost/1"))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.decoding import JSONDecoder, get_json_loads, get_wire_size
+from requests.packages.urllib3.response import HTTPResponse
+from io import BytesIO
+import requests
+import unittest
+import json
+import gzip
+import mock
+
+
+def get_gzipped_response(data):
+    body = BytesIO()
+    with gzip.GzipFile(fileobj=body, mode="wb") as f:
+        f.write(json.dumps(data).encode("utf-8"))
+
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = HTTPResponse(
+        body=BytesIO(body.getvalue()),
+        headers={"Content-Encoding": "gzip"},
+        status=200,
+        preload_content=False,
+    )
+    return response, len(body.getvalue())
+
+
+class JSONDecoderTest(unittest.TestCase):
+
+    def test_get_json_loads(self):
+        fast_json = mock.Mock()
+
+        def import_module(name):
+            if name == "ujson":
+                return fast_json
+            raise ImportError(name)
+
+        with mock.patch("openprocurement.bot.risk_indicators.decoding.import_module", import_module):
+            self.assertEqual(get_json_loads("auto"), ("ujson", fast_json.loads))
+            self.assertEqual(get_json_loads("orjson"), ("json", json.loads))
+
+    def test_fallback(self):
+        decoder = JSONDecoder("json")
+        decoder.name, decoder.loads = "ujson", mock.Mock(side_effect=ValueError("Unsupported"))
+
+        response, _ = get_gzipped_response({"data": [1.5]})
+        self.assertEqual(decoder.decode(response), {"data": [1.5]})
+        self.assertEqual(decoder.fallbacks, 1)
+
+    def test_wire_size(self):
+        response, size = get_gzipped_response({"data": ["risk"] * 100})
+        self.assertEqual(len(response.content), len(json.dumps({"data": ["risk"] * 100})))
+        self.assertEqual(get_wire_size(response), size)
+        self.assertIsNone(get_wire_size(requests.Response()))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.log_queue import LogQueue, QueueHandler, setup_queue_logging
+import unittest
+import logging
+import mock
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super(ListHandler, self).__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+class LogQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.target = ListHandler()
+        self.logger = logging.Logger("LogQueueTest")
+
+    def test_listener(self):
+        log_queue = LogQueue()
+        self.logger.addHandler(QueueHandler(log_queue, [self.target]))
+        log_queue.start()
+
+        args = {"code": 503}
+        self.logger.info("Response code: %(code)s", args)
+        args["code"] = 200
+        try:
+            raise ValueError("Shit happens")
+        except ValueError as e:
+            self.logger.exception(e)
+        log_queue.stop()
+
+        self.assertEqual(self.target.messages[0], "Response code: 503")
+        self.assertTrue(self.target.messages[1].startswith("Shit happens\nTraceback"))
+        self.assertTrue(log_queue.finished)
+
+    def test_bounded_buffer(self):
+        log_queue = LogQueue(size=3, aggregate_limit=0)
+        self.logger.addHandler(QueueHandler(log_queue, [self.target]))
+
+        for i in range(5):
+            self.logger.error("Error %s", i)
+        self.assertEqual(log_queue.dropped, 2)
+
+        log_queue.records.clear()
+        self.logger.error("Error 5")
+        self.assertEqual([record.getMessage() for record, _ in log_queue.records],
+                         ["2 log records were dropped as the log queue was full", "Error 5"])
+
+    @mock.patch("openprocurement.bot.risk_indicators.log_queue.time")
+    def test_aggregation(self, time_mock):
+        time_mock.return_value = 100
+        log_queue = LogQueue(aggregate_interval=60, aggregate_limit=2)
+        self.logger.addHandler(QueueHandler(log_queue, [self.target]))
+
+        for code in (503, 503, 503, 504, 503, 503):
+            self.logger.error("Unsuccessful response code: %s", code)
+        self.logger.info("Sleep")
+        self.assertEqual(log_queue.suppressed, 3)
+        self.assertEqual(len(log_queue.records), 4)  # the different message isn't suppressed
+
+        time_mock.return_value = 161
+        self.logger.info("Sleep")
+
+        self.assertEqual(
+            [record.getMessage() for record, _ in log_queue.records][4:],
+            ["3 identical records were suppressed in 61 seconds: Unsuccessful response code: 503", "Sleep"]
+        )
+        self.assertEqual(log_queue.windows, {})
+
+    @mock.patch("openprocurement.bot.risk_indicators.log_queue.atexit")
+    def test_setup(self, atexit_mock):
+        logger = logging.getLogger("LogQueueSetupTest")
+        logger.addHandler(self.target)
+        self.addCleanup(logger.handlers.pop)
+
+        log_queue = setup_queue_logging()
+        self.addCleanup(log_queue.stop)
+
+        self.assertIsInstance(logger.handlers[0], QueueHandler)
+        self.assertEqual(logger.handlers[0].handlers, [self.target])
+        atexit_mock.register.assert_called_once_with(log_queue.stop)
@@ -36,7 +36,7 @@ class MainScriptTest(unittest.TestCase):
     def test_run(self, sys):
         sys.argv = ["cmd", "openprocurement/bot/risk_indicators/tests/test_config.yaml"]
 
-        with mock.patch('openprocurement.bot.risk_indicators.main.RiskIndicatorBridge') as bridge:
+        with mock.patch('openprocurement.bot.risk_indicators.bridge.RiskIndicatorBridge') as bridge:
             bridge.return_value = mock.MagicMock()
             main()
 
@@ -48,10 +48,52 @@ class MainScriptTest(unittest.TestCase):
         sys.argv = ["cmd", "openprocurement/bot/risk_indicators/tests/test_config.yaml"]
 
         with mock.patch('openprocurement.bot.risk_indicators.main.logger.critical') as log_critical:
-            with mock.patch('openprocurement.bot.risk_indicators.main.RiskIndicatorBridge') as bridge:
+            with mock.patch('openprocurement.bot.risk_indicators.bridge.RiskIndicatorBridge') as bridge:
                 bridge.side_effect = ValueError(7)
                 main()
 
         bridge.assert_called_once()
         log_critical.assert_any_call("Unhandled exception: 7")
 
+
+    @mock.patch('openprocurement.bot.risk_indicators.main.yaml')
+    @mock.patch('openprocurement.bot.risk_indicators.main.sys')
+    def test_engine(self, sys, yaml_mock):
+        sys.argv = ["cmd", "openprocurement/bot/risk_indicators/tests/test_config.yaml"]
+        yaml_mock.load.return_value = {"version": 1, "main": {"engine": "async"}}
+
+        with mock.patch('openprocurement.bot.risk_indicators.bridge.RiskIndicatorBridge') as bridge:
+            with mock.patch('openprocurement.bot.risk_indicators.async_bridge.AsyncRiskIndicatorBridge') as async_bridge:
+                main()
+
+        bridge.assert_not_called()
+        async_bridge.return_value.run.assert_called_once()
+
+        yaml_mock.load.return_value = {"version": 1, "main": {"engine": "asyncio"}}
+        with mock.patch('openprocurement.bot.risk_indicators.main.logger.critical') as log_critical:
+            main()
+
+        log_critical.assert_called_once_with("Unknown engine: asyncio")
+
+    @mock.patch('openprocurement.bot.risk_indicators.main.yaml')
+    @mock.patch('openprocurement.bot.risk_indicators.main.sys')
+    def test_not_mapping_config(self, sys, yaml_mock):
+        sys.argv = ["cmd", "openprocurement/bot/risk_indicators/tests/test_config.yaml"]
+        yaml_mock.load.return_value = "main"
+
+        with mock.patch('openprocurement.bot.risk_indicators.main.logger.critical') as log_critical:
+            main()
+
+        log_critical.assert_called_once_with("Unhandled exception: 'str' object has no attribute 'get'")
+
+    @mock.patch('openprocurement.bot.risk_indicators.main.setup_queue_logging')
+    @mock.patch('openprocurement.bot.risk_indicators.main.yaml')
+    @mock.patch('openprocurement.bot.risk_indicators.main.sys')
+    def test_log_queue(self, sys, yaml_mock, setup_queue_logging):
+        sys.argv = ["cmd", "openprocurement/bot/risk_indicators/tests/test_config.yaml"]
+        yaml_mock.load.return_value = {"version": 1, "main": {"log_queue": True, "log_queue_size": 100}}
+
+        with mock.patch('openprocurement.bot.risk_indicators.bridge.RiskIndicatorBridge'):
+            main()
+
+        setup_queue_logging.assert_called_once_with(size=100, aggregate_interval=60, aggregate_limit=10)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.metrics import Metrics, ProcessStats
+import unittest
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_render(self):
+        metrics = Metrics()
+        metrics.risks.inc(stat="processed")
+        metrics.risks.inc(2, stat="processed")
+        metrics.request_latency.observe(.3, endpoint="queue_page")
+        metrics.request_latency.observe(40, endpoint="queue_page")
+        metrics.queue_page.set(3, region=u'м. "Київ"')
+
+        lines = metrics.render().split(u"\n")
+
+        self.assertIn(u"# TYPE risk_bridge_risks_total counter", lines)
+        self.assertIn(u'risk_bridge_risks_total{stat="processed"} 3', lines)
+        self.assertIn(u'risk_bridge_request_duration_seconds_bucket{endpoint="queue_page",le="0.25"} 0', lines)
+        self.assertIn(u'risk_bridge_request_duration_seconds_bucket{endpoint="queue_page",le="0.5"} 1', lines)
+        self.assertIn(u'risk_bridge_request_duration_seconds_bucket{endpoint="queue_page",le="+Inf"} 2', lines)
+        self.assertIn(u'risk_bridge_request_duration_seconds_sum{endpoint="queue_page"} 40.3', lines)
+        self.assertIn(u'risk_bridge_request_duration_seconds_count{endpoint="queue_page"} 2', lines)
+        self.assertIn(u'risk_bridge_queue_page{region="м. \\"Київ\\""} 3', lines)
+
+    def test_wsgi_app(self):
+        metrics = Metrics()
+        responses = []
+
+        def start_response(status, headers):
+            responses.append(status)
+
+        body = metrics.wsgi_app({"PATH_INFO": "/metrics"}, start_response)
+        self.assertIn(b"# TYPE risk_bridge_queue_page gauge", body[0])
+
+        metrics.wsgi_app({"PATH_INFO": "/"}, start_response)
+        self.assertEqual(responses, ["200 OK", "404 Not Found"])
+
+    def test_process_stats(self):
+        metrics = Metrics()
+        stats = ProcessStats(metrics.risks)
+        stats["processed"] += 1
+        stats["processed"] += 1
+        self.assertEqual(stats["failed"], 0)
+
+        stats = ProcessStats(metrics.risks)  # a new run keeps counting
+        stats["processed"] += 1
+
+        self.assertEqual(dict(stats), {"processed": 1})
+        self.assertEqual(metrics.risks.get(stat="processed"), 3)
+        self.assertEqual(metrics.risks.get(stat="failed"), 0)
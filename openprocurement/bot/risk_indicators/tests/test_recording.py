@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.recording import Recorder, Replayer
+import requests
+import unittest
+import tempfile
+import shutil
+import json
+import mock
+import os
+
+
+class RecordingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    def record(self, path, calls):
+        recorder = Recorder(path, secrets=["secret"])
+        for method, url, response in calls:
+            func = mock.Mock(side_effect=[response])
+            try:
+                recorder.wrap(method, func)(url, json={"token": "secret"} if method == "post" else None)
+            except requests.ConnectionError:
+                pass
+        recorder.close()
+
+    def test_replay(self):
+        path = os.path.join(self.tmp_dir, "record.jsonl.gz")
+        responses = []
+        for status, body in ((503, b""), (200, b'{"data": [1]}'), (200, b'{"data": [1, 2]}')):
+            response = requests.Response()
+            response.status_code = status
+            response.headers["Retry-After"] = "1"
+            response._content = body
+            responses.append(response)
+
+        self.record(path, [("get", "http://q/?page=0", response) for response in responses])
+        self.record(path, [("get", "http://q/?page=1", requests.ConnectionError("reset"))])
+
+        replayer = Replayer(path)
+        first = replayer.replay("get", "http://q/?page=0")
+        self.assertEqual((first.status_code, first.headers["retry-after"]), (503, "1"))
+        self.assertEqual(replayer.replay("get", "http://q/?page=0").json(), {"data": [1]})
+        self.assertEqual(replayer.replay("get", "http://q/?page=0").json(), {"data": [1, 2]})
+        self.assertEqual(replayer.replay("get", "http://q/?page=0").json(), {"data": [1, 2]})  # the last is repeated
+        self.assertEqual(b"".join(replayer.replay("get", "http://q/?page=0").iter_content(4)), b'{"data": [1, 2]}')
+
+        with self.assertRaises(requests.ConnectionError):
+            replayer.replay("get", "http://q/?page=1")
+        self.assertEqual(replayer.replay("get", "http://q/?page=2").status_code, 404)
+
+        post = replayer.replay("post", "http://m/monitorings")
+        self.assertEqual((post.status_code, post.json()["data"]["id"]), (201, "replay-1"))
+
+    def test_redaction(self):
+        path = os.path.join(self.tmp_dir, "record.jsonl")
+        response = requests.Response()
+        response.status_code = 201
+        response._content = b'{"owner_token": "secret"}'
+
+        self.record(path, [("post", "http://m/monitorings?acc_token=secret", response)])
+
+        with open(path) as f:
+            record = json.loads(f.read())
+        self.assertEqual(record["url"], "http://m/monitorings?acc_token=***")
+        self.assertEqual(record["json"], {"token": "***"})
+        self.assertEqual(record["body"], '{"owner_token": "***"}')
+
+    @mock.patch("openprocurement.bot.risk_indicators.recording.sleep")
+    def test_replay_speed(self, sleep_mock):
+        path = os.path.join(self.tmp_dir, "record.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps({"method": "get", "url": "http://q/", "elapsed": 2,
+                                "status": 200, "headers": {}, "body": "[]"}) + "\n")
+
+        Replayer(path, speed=4).replay("get", "http://q/")
+
+        sleep_mock.assert_called_once_with(.5)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.scheduler import RegionScheduler
+import unittest
+import mock
+
+
+class RegionSchedulerTest(unittest.TestCase):
+
+    @mock.patch("openprocurement.bot.risk_indicators.scheduler.time")
+    def test_intervals(self, time_mock):
+        time_mock.return_value = 1000.
+        scheduler = RegionScheduler(min_interval=100, max_interval=400, jitter=0)
+
+        scheduler.set_regions([u"м. Київ", u"Севастополь"])
+        for state in scheduler.regions.values():
+            self.assertTrue(1000 <= state.next_poll <= 1100)
+
+        region, wait = scheduler.get_next()
+        self.assertEqual(wait, scheduler.regions[region].next_poll - 1000)
+
+        scheduler.finish_poll(u"м. Київ", changed=0)
+        scheduler.finish_poll(u"м. Київ", changed=0)
+        scheduler.finish_poll(u"м. Київ", changed=0)
+        self.assertEqual(scheduler.regions[u"м. Київ"].interval, 337.5)
+        scheduler.finish_poll(u"м. Київ", changed=0)
+        self.assertEqual(scheduler.regions[u"м. Київ"].interval, 400)
+        scheduler.finish_poll(u"м. Київ", changed=5)
+        self.assertEqual(scheduler.regions[u"м. Київ"].interval, 200)
+        self.assertEqual(scheduler.regions[u"м. Київ"].next_poll, 1200)
+        self.assertEqual(scheduler.get_next()[0], u"Севастополь")
+
+        scheduler.fail_poll(u"Севастополь", delay=30)
+        self.assertEqual(scheduler.get_next(), (u"Севастополь", 30))
+
+        scheduler.set_regions([u"Севастополь"])
+        self.assertEqual(list(scheduler.regions), [u"Севастополь"])
+
+    def test_changes(self):
+        scheduler = RegionScheduler(min_interval=100, max_interval=400)
+        scheduler.set_regions(["a"])
+        risk = {"tenderOuterId": "1", "tenderScore": .5, "topRisk": True}
+
+        scheduler.start_poll("a")
+        self.assertTrue(scheduler.is_changed("a", risk))
+        scheduler.mark_seen("a", risk)
+        scheduler.finish_poll("a", changed=1)
+
+        scheduler.start_poll("a")
+        self.assertFalse(scheduler.is_changed("a", risk))
+        self.assertTrue(scheduler.is_changed("a", dict(risk, tenderScore=.6)))
+        scheduler.finish_poll("a", changed=0)  # the risk is not in the queue anymore
+
+        self.assertTrue(scheduler.is_changed("a", risk))
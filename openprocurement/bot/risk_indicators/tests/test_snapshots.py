@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.snapshots import (
+    SnapshotWriter, SnapshotDir, Snapshot, diff, summarize, get_skip_list, np, UNCHANGED
+)
+import unittest
+import tempfile
+import shutil
+import os
+
+
+def get_snapshot(risks, outcome="not_top_risk"):
+    writer = SnapshotWriter()
+    for tender_id, region, score, top_risk in risks:
+        writer.add({"tenderOuterId": tender_id, "region": region, "tenderScore": score, "topRisk": top_risk}, outcome)
+    return writer.get_snapshot()
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class SnapshotTest(unittest.TestCase):
+
+    def test_save_load(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        snapshot_dir = SnapshotDir(os.path.join(tmp_dir, "snapshots"), keep=2)
+        self.assertIsNone(snapshot_dir.get_latest())
+
+        for score in (.1, .2, .3):
+            writer = SnapshotWriter()
+            writer.add({"tenderOuterId": u"1", "region": u"м. Київ", "tenderScore": score, "topRisk": True}, "created")
+            writer.add({"tenderOuterId": u"2", "region": None, "tenderScore": None, "topRisk": False}, UNCHANGED)
+            snapshot_dir.save(writer)
+
+        self.assertEqual(len(snapshot_dir.list()), 2)
+        snapshot = snapshot_dir.get_latest()
+        self.assertIsInstance(snapshot, Snapshot)
+        row = list(snapshot.tender_id).index(b"1")
+        self.assertEqual(snapshot.regions[snapshot.region[row]], u"м. Київ")
+        self.assertEqual(snapshot.score[row], .3)
+        self.assertEqual(get_skip_list(snapshot), {u"1": (.3, True)})
+
+    def test_diff(self):
+        old = get_snapshot([("1", u"A", .1, False), ("2", u"A", .2, True), ("3", u"B", None, True)])
+        new = get_snapshot([("2", u"A", .2, False), ("3", u"B", None, True), ("4", u"B", .5, True)])
+
+        changes = diff(old, new)
+
+        self.assertEqual(sorted(new.tender_id[changes.new]), [b"4"])
+        self.assertEqual(sorted(new.tender_id[changes.changed]), [b"2"])
+        self.assertEqual(sorted(new.tender_id[changes.unchanged]), [b"3"])
+        self.assertEqual(sorted(old.tender_id[changes.removed]), [b"1"])
+
+        changes = diff(get_snapshot([]), new)
+        self.assertTrue(changes.new.all())
+
+    def test_summarize(self):
+        old = get_snapshot([("1", u"A", .1, False), ("2", u"C", .2, True)])
+        new = get_snapshot(
+            [("1", u"A", .3, False)] + [("b{}".format(i), u"B", i / 10., i % 2 == 0) for i in range(2, 12)]
+        )
+
+        summary = summarize(new, old, percentiles=(50, 90))
+
+        self.assertEqual(summary[u"A"], {
+            "risks": 1, "top_risks": 0, "top_share": 0, "score_percentiles": {50: .3, 90: .3},
+            "new": 0, "changed": 1, "removed": 0,
+        })
+        self.assertEqual(summary[u"B"]["risks"], 10)
+        self.assertEqual(summary[u"B"]["top_share"], .5)
+        self.assertEqual(summary[u"B"]["score_percentiles"], {50: .65, 90: 1.01})
+        self.assertEqual(summary[u"B"]["new"], 10)
+        self.assertEqual(summary[u"C"]["removed"], 1)
+        self.assertNotIn("new", summarize(new)[u"A"])
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.storage import (
+    ProcessedTenderStore, CheckpointStore, MonitoringOutbox, LeaseStore
+)
+import unittest
+import tempfile
+import shutil
+import mock
+import os.path
+
+
+class ProcessedTenderStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = ProcessedTenderStore(os.path.join(self.tmp_dir, "bridge.db"), ttl=3600)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_save_get(self):
+        risk = {"tenderOuterId": "1", "tenderScore": .5, "topRisk": True}
+        self.assertIsNone(self.store.get("1"))
+
+        self.store.save(risk, ProcessedTenderStore.CREATED)
+
+        entry = self.store.get("1")
+        self.assertEqual(entry["outcome"], ProcessedTenderStore.CREATED)
+        self.assertEqual(entry["tender_score"], .5)
+        self.assertIs(entry["top_risk"], True)
+
+    def test_is_unchanged(self):
+        risk = {"tenderOuterId": "1", "tenderScore": .5, "topRisk": True}
+        self.assertFalse(self.store.is_unchanged(risk))
+
+        self.store.save(risk, ProcessedTenderStore.LIVE_MONITORING)
+        self.assertTrue(self.store.is_unchanged(risk))
+        self.assertFalse(self.store.is_unchanged(dict(risk, tenderScore=.6)))
+        self.assertFalse(self.store.is_unchanged(dict(risk, topRisk=False)))
+
+        with mock.patch("openprocurement.bot.risk_indicators.storage.time", return_value=10 ** 10):
+            self.assertFalse(self.store.is_unchanged(risk))
+
+
+class CheckpointStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = CheckpointStore(os.path.join(self.tmp_dir, "bridge.db"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_resume_run(self):
+        run_id = self.store.start_run(window=3600, shard_id="shard-0")
+        self.assertEqual(self.store.get_next_page(run_id, u"м. Київ"), 0)
+
+        self.store.save_page(run_id, u"м. Київ", 0, done=False)
+        self.store.save_page(run_id, u"Севастополь", 2, done=True)
+
+        self.assertEqual(self.store.start_run(window=3600, shard_id="shard-0"), run_id)
+        self.assertEqual(self.store.get_next_page(run_id, u"м. Київ"), 1)
+        self.assertIsNone(self.store.get_next_page(run_id, u"Севастополь"))
+
+    def test_finished_or_expired_run(self):
+        run_id = self.store.start_run(window=3600, shard_id="shard-0")
+        self.store.finish_run(run_id)
+        next_run_id = self.store.start_run(window=3600, shard_id="shard-0")
+        self.assertNotEqual(next_run_id, run_id)
+
+        self.store.save_page(next_run_id, u"м. Київ", 0, done=False)
+        with mock.patch("openprocurement.bot.risk_indicators.storage.time", return_value=10 ** 10):
+            new_run_id = self.store.start_run(window=3600, shard_id="shard-0")
+
+        self.assertNotEqual(new_run_id, next_run_id)
+        self.assertEqual(self.store.get_next_page(new_run_id, u"м. Київ"), 0)
+
+    def test_shards_runs(self):
+        run_id = self.store.start_run(window=3600, shard_id="shard-0")
+        self.store.save_page(run_id, u"м. Київ", 0, done=False)
+
+        other_run_id = self.store.start_run(window=3600, shard_id="shard-1")
+        self.assertNotEqual(other_run_id, run_id)
+        self.store.finish_run(other_run_id)
+        self.assertNotEqual(self.store.start_run(window=3600, shard_id="shard-1"), other_run_id)
+
+        self.assertEqual(self.store.start_run(window=3600, shard_id="shard-0"), run_id)
+        self.assertEqual(self.store.get_next_page(run_id, u"м. Київ"), 1)
+
+
+class MonitoringOutboxTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.outbox = MonitoringOutbox(os.path.join(self.tmp_dir, "bridge.db"))
+
+    def tearDown(self):
+        self.outbox.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_put_get_delete(self):
+        self.assertTrue(self.outbox.put("1", {"tender_id": "1", "riskIndicatorsRegion": u"м. Київ"}))
+        self.assertTrue(self.outbox.put("2", {"tender_id": "2"}))
+        self.assertFalse(self.outbox.put("1", {"tender_id": "1"}))
+        self.assertEqual(len(self.outbox), 2)
+
+        self.assertEqual(
+            self.outbox.get_ready(1, ttl=60),
+            [("1", {"tender_id": "1", "riskIndicatorsRegion": u"м. Київ"}, 0)]
+        )
+
+        self.outbox.delete("1")
+        self.assertEqual(self.outbox.get_ready(10, ttl=60), [("2", {"tender_id": "2"}, 0)])
+
+    def test_reschedule(self):
+        self.outbox.put("1", {"tender_id": "1"})
+        self.outbox.reschedule("1", delay=60)
+        self.assertEqual(self.outbox.get_ready(10, ttl=60), [])
+
+        with mock.patch("openprocurement.bot.risk_indicators.storage.time", return_value=10 ** 10):
+            self.assertEqual(self.outbox.get_ready(10, ttl=60), [("1", {"tender_id": "1"}, 1)])
+
+    def test_claim(self):
+        self.outbox.put("1", {"tender_id": "1"})
+        other_outbox = MonitoringOutbox(os.path.join(self.tmp_dir, "bridge.db"))
+        self.addCleanup(other_outbox.close)
+
+        self.assertEqual(self.outbox.get_ready(10, ttl=60), [("1", {"tender_id": "1"}, 0)])
+        self.assertEqual(other_outbox.get_ready(10, ttl=60), [])
+
+        with mock.patch("openprocurement.bot.risk_indicators.storage.time", return_value=10 ** 10):
+            self.assertEqual(other_outbox.get_ready(10, ttl=60), [("1", {"tender_id": "1"}, 0)])
+
+
+class LeaseStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(self.tmp_dir, "leases.db")
+        self.store, self.other_store = LeaseStore(path), LeaseStore(path)
+
+    def tearDown(self):
+        self.store.close()
+        self.other_store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_acquire(self):
+        self.assertTrue(self.store.acquire(u"м. Київ", "shard-0", ttl=60))
+        self.assertTrue(self.store.acquire(u"м. Київ", "shard-0", ttl=60))
+        self.assertFalse(self.other_store.acquire(u"м. Київ", "shard-1", ttl=60))
+
+        with mock.patch("openprocurement.bot.risk_indicators.storage.time", return_value=10 ** 10):
+            self.assertTrue(self.other_store.acquire(u"м. Київ", "shard-1", ttl=60))
+
+        self.store.release(u"Севастополь", "shard-0")
+        self.assertTrue(self.other_store.acquire(u"Севастополь", "shard-1", ttl=60))
+        self.other_store.release(u"Севастополь", "shard-1")
+        self.assertTrue(self.store.acquire(u"Севастополь", "shard-0", ttl=60))
+
+    def test_heartbeats_stats(self):
+        self.store.heartbeat("shard-0", 0)
+        self.other_store.heartbeat("shard-1", 1)
+        self.assertEqual(self.store.get_live_shards(ttl=60), {0, 1})
+        with mock.patch("openprocurement.bot.risk_indicators.storage.time", return_value=10 ** 10):
+            self.assertEqual(self.store.get_live_shards(ttl=60), set())
+
+        self.store.save_stats("shard-0", {"processed": 3, "created": 1})
+        self.other_store.save_stats("shard-1", {"processed": 2})
+        self.assertEqual(
+            self.store.get_stats(),
+            (
+                {"shard-0": {"processed": 3, "created": 1}, "shard-1": {"processed": 2}},
+                {"processed": 5, "created": 1},
+            )
+        )
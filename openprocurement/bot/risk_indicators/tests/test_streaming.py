@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.streaming import RiskRecord, JSONObjectStream, StreamedQueuePage
+from collections import OrderedDict
+import unittest
+import json
+
+
+def chunked(content, size):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+page = OrderedDict([
+    ("pagination", {"totalPages": 3, "page": 1}),
+    ("data", [
+        {
+            "tenderId": "UA-1",
+            "tenderOuterId": "1",
+            "tenderScore": 1.125,
+            "topRisk": True,
+            "region": u"м. Київ",
+            "procuringEntity": {"name": u"Замовник", "id": 1},
+        },
+        {
+            "tenderId": "UA-2",
+            "tenderOuterId": "2",
+            "tenderScore": 12,
+            "topRisk": False,
+            "region": u"Севастополь",
+        },
+    ]),
+    ("total", 1000),
+])
+
+
+class JSONObjectStreamTest(unittest.TestCase):
+
+    def test_chunks(self):
+        content = json.dumps(page, ensure_ascii=False, indent=1).encode("utf-8")
+
+        for size in (1, 2, 3, 7, 64, len(content)):
+            members = list(JSONObjectStream(chunked(content, size), "data"))
+            self.assertEqual([key for key, _ in members], ["pagination", "data", "data", "total"])
+            self.assertEqual(dict(members[:1] + members[3:]), {"pagination": page["pagination"], "total": 1000})
+            self.assertEqual([value for key, value in members if key == "data"], page["data"])
+
+    def test_empty(self):
+        self.assertEqual(list(JSONObjectStream([b" {} "], "data")), [])
+        self.assertEqual(list(JSONObjectStream([b'{"data": [', b"]}"], "data")), [])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            list(JSONObjectStream([b'{"data": [1, 2'], "data"))
+        with self.assertRaises(ValueError):
+            list(JSONObjectStream([b'["data"]'], "data"))
+
+
+class StreamedQueuePageTest(unittest.TestCase):
+
+    def test_get(self):
+        content = json.dumps(page).encode("utf-8")
+        streamed_page = StreamedQueuePage(chunked(content, 10))
+
+        records = list(streamed_page.get("data", []))
+        self.assertEqual(streamed_page.get("pagination", {}).get("totalPages"), 3)
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0], RiskRecord.from_dict(page["data"][0]))
+        self.assertEqual(records[0]["region"], u"м. Київ")
+        self.assertEqual(records[1].get("tenderScore"), 12)
+        self.assertIs(records[1]["topRisk"], False)
+        with self.assertRaises(KeyError):
+            records[0]["procuringEntity"]
+
+    def test_load(self):
+        streamed_page = StreamedQueuePage(chunked(json.dumps(page).encode("utf-8"), 10)).load()
+
+        self.assertEqual(streamed_page.get("total"), 1000)
+        self.assertEqual(len(streamed_page.get("data")), 2)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.throttling import (
+    CircuitBreaker, TokenBucket, AIMDLimiter, get_backoff_delay, parse_retry_after
+)
+from email.utils import formatdate
+from time import time
+import unittest
+import gevent
+import mock
+
+
+class BackoffTest(unittest.TestCase):
+
+    def test_get_backoff_delay(self):
+        for attempt, (low, high) in enumerate(((.5, 1), (1, 2), (2, 4), (4, 8), (5, 10), (5, 10)), 1):
+            delay = get_backoff_delay(attempt, base=1, maximum=10)
+            self.assertTrue(low <= delay <= high, (attempt, delay))
+
+    def test_parse_retry_after(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("120"), 120)
+
+        seconds = parse_retry_after(formatdate(time() + 60, usegmt=True))
+        self.assertTrue(55 < seconds <= 60, seconds)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_open_close(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.failure()
+        self.assertFalse(breaker.is_open)
+        breaker.failure()
+        self.assertTrue(breaker.is_open)
+
+        with mock.patch("openprocurement.bot.risk_indicators.throttling.time", return_value=time() + 61):
+            self.assertFalse(breaker.is_open)
+            breaker.failure()  # the trial call after cooldown fails
+            self.assertTrue(breaker.is_open)
+
+        breaker.success()
+        self.assertFalse(breaker.is_open)
+        self.assertEqual(breaker.failures, 0)
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    @mock.patch("openprocurement.bot.risk_indicators.throttling.time")
+    def test_reserve(self, time_mock):
+        time_mock.return_value = 1000.
+        bucket = TokenBucket(rate=2)
+
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0, 0, .5, 1.])
+
+        time_mock.return_value = 1010.
+        self.assertEqual(bucket.reserve(), 0)  # refilled up to the burst
+        self.assertEqual(bucket.effective_rate, .5)
+
+
+class AIMDLimiterTest(unittest.TestCase):
+
+    def test_limit_adjustment(self):
+        limiter = AIMDLimiter(initial=2, minimum=1, maximum=3, latency_target=1)
+
+        for _ in range(2):
+            limiter.acquire()
+            limiter.release(latency=.1)
+        self.assertAlmostEqual(limiter.limit, 2.9)  # 2 + 1/2 + 1/2.5
+
+        limiter.acquire()
+        limiter.release(latency=.1)
+        self.assertEqual(limiter.limit, 3)
+
+        limiter.acquire()
+        limiter.release(latency=5)
+        self.assertEqual(limiter.limit, 3)  # slow calls don't change it
+
+        limiter.acquire()
+        limiter.release(latency=.1, failed=True)
+        self.assertEqual(limiter.limit, 1.5)
+        limiter.acquire()
+        limiter.release(latency=.1, failed=True)
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.in_flight, 0)
+
+        limiter.acquire()
+        limiter.cancel()
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_acquire_waits(self):
+        limiter = AIMDLimiter(initial=2, minimum=1, maximum=2, latency_target=1)
+        running = []
+
+        def call(n):
+            limiter.acquire()
+            running.append(limiter.in_flight)
+            gevent.sleep(.01)
+            limiter.release(latency=.01)
+
+        gevent.joinall([gevent.spawn(call, n) for n in range(6)])
+        self.assertEqual(max(running), 2)
+        self.assertEqual(len(running), 6)
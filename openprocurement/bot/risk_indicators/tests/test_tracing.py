@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from openprocurement.bot.risk_indicators.tracing import Tracer, Profiler
+import unittest
+import tempfile
+import shutil
+import json
+import mock
+import os
+
+
+class TracerTest(unittest.TestCase):
+
+    @mock.patch("openprocurement.bot.risk_indicators.tracing.time")
+    def test_spans(self, time_mock):
+        time_mock.side_effect = [10, 11.5, 12, 12.5]
+
+        tracer = Tracer(max_events=1)
+        with tracer.span("queue_page"):
+            pass
+        with self.assertRaises(ValueError):
+            with tracer.span("queue_page"):
+                raise ValueError()
+
+        self.assertEqual(tracer.get_summary(), {"queue_page": {"count": 2, "total": 2, "max": 1.5}})
+        self.assertEqual(len(tracer.events), 1)
+        self.assertEqual(tracer.events[0]["dur"], 1500000)
+        self.assertEqual(tracer.events_dropped, 1)
+
+        tracer.reset()
+        self.assertEqual(tracer.get_summary(), {})
+
+    def test_dump(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, "trace.json")
+
+        tracer = Tracer(max_events=10)
+        tracer.add("item_details", 100, .25)
+        tracer.dump(path)
+
+        with open(path) as f:
+            trace = json.load(f)
+        self.assertEqual(trace["traceEvents"][0]["name"], "item_details")
+        self.assertEqual(trace["traceEvents"][0]["ts"], 100000000)
+        self.assertEqual(trace["otherData"]["phases"]["item_details"]["count"], 1)
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_toggle(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        profiler = Profiler(tmp_dir)
+        self.assertIsNone(profiler.stop())
+
+        profiler.toggle()
+        self.assertTrue(profiler.enabled)
+        sum(range(1000))
+        profiler.toggle()
+
+        self.assertFalse(profiler.enabled)
+        self.assertEqual(len(os.listdir(tmp_dir)), 1)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+from email.utils import parsedate_tz, mktime_tz
+from random import uniform
+from time import time
+from gevent.event import Event
+
+
+def get_backoff_delay(attempt, base, maximum):
+    """
+    Exponential backoff with "equal jitter": a random delay between the half and the whole of base * 2 ^ (attempt - 1)
+    """
+    delay = min(maximum, base * 2 ** (attempt - 1))
+    return delay / 2. + uniform(0, delay / 2.)
+
+
+def parse_retry_after(value):
+    """
+    Returns the seconds to wait from a Retry-After header, that is either seconds or an HTTP date
+    """
+    if not value:
+        return None
+    try:
+        return max(0, int(value))
+    except ValueError:
+        date = parsedate_tz(value)
+        if date is not None:
+            return max(0, mktime_tz(date) - time())
+
+
+class CircuitBreaker(object):
+    """
+    Opens after threshold consecutive failures and rejects calls for cooldown seconds,
+    then lets calls through again until the next failure opens it for another cooldown
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened = None
+
+    @property
+    def is_open(self):
+        return self.opened is not None and time() - self.opened < self.cooldown
+
+    def success(self):
+        self.failures = 0
+        self.opened = None
+
+    def failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened = time()
+
+
+class TokenBucket(object):
+    """
+    Allows rate calls per second on average with bursts of up to burst calls.
+    reserve() takes a token and returns the seconds to wait before the call
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst or max(1., self.rate)
+        self.tokens = self.burst
+        self.updated = time()
+        self.reset_stats()
+
+    def reserve(self):
+        now = time()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        self.granted += 1
+        return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def reset_stats(self):
+        self.granted = 0
+        self.stats_started = time()
+
+    @property
+    def effective_rate(self):
+        elapsed = time() - self.stats_started
+        return self.granted / elapsed if elapsed > 0 else 0.
+
+
+class AIMDLimiter(object):
+    """
+    Limits the number of concurrent calls. The limit grows additively (by one per "limit" calls)
+    while calls succeed faster than latency_target and is multiplied by decrease_factor on every failure
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_target, decrease_factor=.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.released = Event()
+
+    def acquire(self):
+        while self.in_flight >= int(self.limit):
+            self.released.clear()
+            self.released.wait()
+        self.in_flight += 1
+
+    def release(self, latency, failed=False):
+        self.in_flight -= 1
+        if failed:
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        elif latency <= self.latency_target:
+            self.limit = min(self.maximum, self.limit + 1. / self.limit)
+        self.released.set()
+
+    def cancel(self):
+        """
+        Frees the slot of a call that was interrupted, it tells nothing about the upstream so the limit is kept
+        """
+        self.in_flight -= 1
+        self.released.set()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from time import time
+import cProfile
+import gevent
+import json
+import os
+import logging
+
+logger = logging.getLogger("RiskIndicatorBridge")
+
+
+class Tracer(object):
+    """
+    Wall time of the named phases of a run: count, total and max per phase and,
+    up to max_events, the spans themselves for a trace file in the Chrome trace event format
+    (chrome://tracing, Perfetto), one track per greenlet
+    """
+
+    def __init__(self, max_events=0):
+        self.max_events = max_events
+        self.reset()
+
+    def reset(self):
+        self.phases = defaultdict(lambda: [0, 0., 0.])  # name -> [count, total, max]
+        self.events = []
+        self.events_dropped = 0
+
+    @contextmanager
+    def span(self, name):
+        started = time()
+        try:
+            yield
+        finally:
+            self.add(name, started, time() - started)
+
+    def add(self, name, started, duration):
+        phase = self.phases[name]
+        phase[0] += 1
+        phase[1] += duration
+        phase[2] = max(phase[2], duration)
+
+        if len(self.events) < self.max_events:
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": int(started * 1e6),
+                "dur": int(duration * 1e6),
+                "pid": os.getpid(),
+                "tid": id(gevent.getcurrent()),
+            })
+        elif self.max_events:
+            self.events_dropped += 1
+
+    def get_summary(self):
+        return {
+            name: {"count": count, "total": round(total, 3), "max": round(max_duration, 3)}
+            for name, (count, total, max_duration) in self.phases.items()
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump({
+                "traceEvents": self.events,
+                "otherData": {"phases": self.get_summary(), "events_dropped": self.events_dropped},
+            }, f)
+
+
+class Profiler(object):
+    """
+    cProfile of the process that can be switched on and off at any moment,
+    every stop writes the collected stats to a new file in directory
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.profile = None
+
+    @property
+    def enabled(self):
+        return self.profile is not None
+
+    def start(self):
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            logger.info("Profiling started")
+
+    def stop(self):
+        """
+        Returns the path of the stats file
+        """
+        if self.profile is None:
+            return
+
+        self.profile.disable()
+        path = os.path.join(
+            self.directory,
+            "profile-{}-{}.prof".format(os.getpid(), datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+        )
+        self.profile.dump_stats(path)
+        self.profile = None
+        logger.info("Profiling stopped, stats are written to {}".format(path))
+        return path
+
+    def toggle(self, *args):
+        """
+        Signal handler compatible
+        """
+        if self.enabled:
+            self.stop()
+        else:
+            self.start()
@@ -17,7 +17,8 @@ test_requires = requires + [
 
 entry_points = {
     'console_scripts': [
-        'risk_indicator_bot = openprocurement.bot.risk_indicators.main:main'
+        'risk_indicator_bot = openprocurement.bot.risk_indicators.main:main',
+        'risk_indicator_benchmark = openprocurement.bot.risk_indicators.benchmark:main',
     ]
 }
 
@@ -39,6 +40,6 @@ setup(name='openprocurement.bot.risk_indicators',
       zip_safe=False,
       install_requires=requires,
       tests_require=test_requires,
-      extras_require={'test': test_requires},
+      extras_require={'test': test_requires, 'snapshots': ['numpy']},
       entry_points=entry_points,
       )